@@ -1,8 +1,193 @@
 import tkinter as tk
 from tkinter import font as tkfont
+import ast
 import math
+import operator
+from functools import lru_cache, partial
+
+# Operators the expression evaluator understands (everything else is rejected)
+_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+@lru_cache(maxsize=256)
+def _compile(expr):
+    """Parse an expression once and cache the resulting AST body"""
+    return ast.parse(expr, mode='eval').body
+
+
+def _eval_ast(node):
+    """Walk a parsed expression, allowing only numbers and arithmetic operators"""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval_ast(node.left), _eval_ast(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval_ast(node.operand))
+    raise ValueError("Unsupported expression")
+
+
+def evaluate(expr):
+    """Evaluate a calculator expression without going through eval()"""
+    return _eval_ast(_compile(expr))
+
+
+# Batch mode: expressions are compiled to a flat RPN program (opcodes plus a
+# constant pool) and run by a Numba-compiled interpreter in a single call.
+# JIT dispatch only pays off for larger batches, smaller ones use evaluate().
+_BATCH_JIT_THRESHOLD = 128
+
+_OP_PUSH, _OP_ADD, _OP_SUB, _OP_MUL, _OP_DIV, _OP_MOD, _OP_NEG = range(7)
+_BINARY_OPCODES = {
+    ast.Add: _OP_ADD,
+    ast.Sub: _OP_SUB,
+    ast.Mult: _OP_MUL,
+    ast.Div: _OP_DIV,
+    ast.Mod: _OP_MOD,
+}
+
+
+def _emit_rpn(node, opcodes, consts):
+    """Append the RPN form of a parsed expression to opcodes/consts"""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        opcodes.append(_OP_PUSH)
+        consts.append(float(node.value))
+    elif isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPCODES:
+        _emit_rpn(node.left, opcodes, consts)
+        _emit_rpn(node.right, opcodes, consts)
+        opcodes.append(_BINARY_OPCODES[type(node.op)])
+    elif isinstance(node, ast.UnaryOp) and type(node.op) in (ast.USub, ast.UAdd):
+        _emit_rpn(node.operand, opcodes, consts)
+        if isinstance(node.op, ast.USub):
+            opcodes.append(_OP_NEG)
+    else:
+        raise ValueError("Unsupported expression")
+
+
+def _run_rpn_batch(opcodes, consts, op_starts, const_starts, stack, out):
+    """Interpret each RPN program in turn; division/modulo by zero yields NaN"""
+    for k in range(out.shape[0]):
+        sp = 0
+        ci = const_starts[k]
+        ok = True
+        for pc in range(op_starts[k], op_starts[k + 1]):
+            op = opcodes[pc]
+            if op == _OP_PUSH:
+                stack[sp] = consts[ci]
+                ci += 1
+                sp += 1
+            elif op == _OP_NEG:
+                stack[sp - 1] = -stack[sp - 1]
+            else:
+                sp -= 1
+                b = stack[sp]
+                a = stack[sp - 1]
+                if op == _OP_ADD:
+                    stack[sp - 1] = a + b
+                elif op == _OP_SUB:
+                    stack[sp - 1] = a - b
+                elif op == _OP_MUL:
+                    stack[sp - 1] = a * b
+                elif b == 0.0:
+                    ok = False
+                    break
+                elif op == _OP_DIV:
+                    stack[sp - 1] = a / b
+                else:
+                    stack[sp - 1] = a % b
+        out[k] = stack[0] if ok else math.nan
+
+
+@lru_cache(maxsize=None)
+def _jit_batch_runner():
+    """
+    Return (numpy, compiled _run_rpn_batch), or None without NumPy/Numba.
+    Imported on first use so launching the calculator doesn't pay for numba.
+    """
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        return None
+    return np, njit(cache=True)(_run_rpn_batch)
+
+
+def evaluate_batch(expressions):
+    """
+    Evaluate many calculator expressions, returning a list of floats.
+    Expressions that fail to parse or divide by zero evaluate to NaN.
+    """
+    runner = _jit_batch_runner() if len(expressions) > _BATCH_JIT_THRESHOLD else None
+    if runner is None:
+        results = []
+        for expr in expressions:
+            try:
+                results.append(float(evaluate(expr)))
+            except Exception:
+                results.append(math.nan)
+        return results
+
+    opcodes, consts = [], []
+    op_starts, const_starts = [0], []
+    for expr in expressions:
+        const_starts.append(len(consts))
+        try:
+            _emit_rpn(_compile(expr), opcodes, consts)
+        except Exception:
+            # Reject the expression: a lone NaN constant keeps the program valid
+            del opcodes[op_starts[-1]:], consts[const_starts[-1]:]
+            opcodes.append(_OP_PUSH)
+            consts.append(math.nan)
+        op_starts.append(len(opcodes))
+
+    np, run_rpn_batch = runner
+    out = np.empty(len(expressions), dtype=np.float64)
+    run_rpn_batch(
+        np.array(opcodes, dtype=np.int8),
+        np.array(consts, dtype=np.float64),
+        np.array(op_starts, dtype=np.int64),
+        np.array(const_starts, dtype=np.int64),
+        np.empty(max(len(consts), 1), dtype=np.float64),
+        out,
+    )
+    return out.tolist()
+
+
+def _on_enter(e):
+    e.widget['background'] = e.widget._hover_bg
+
+
+def _on_leave(e):
+    e.widget['background'] = e.widget._base_bg
+
 
 class Calculator:
+    # Fixed attribute set: no per-instance __dict__ and faster attribute access in callbacks
+    __slots__ = (
+        'root', 'expression', 'result_shown',
+        'display_font', 'button_font', 'small_button_font', 'label',
+    )
+
+    # Keyboard shortcuts: event char (or keysym for special keys) -> (method name, args)
+    _KEYMAP = {
+        **{digit: ('add_digit', (digit,)) for digit in '0123456789'},
+        '.': ('add_decimal', ()),
+        '+': ('on_operation', ('+',)),
+        '-': ('on_operation', ('-',)),
+        '*': ('on_operation', ('*',)),
+        '/': ('on_operation', ('/',)),
+        'Return': ('calculate', ()),
+        'BackSpace': ('backspace', ()),
+        'Escape': ('clear_all', ()),
+    }
+
     def __init__(self, root):
         self.root = root
         self.root.title("Calculator")
@@ -11,7 +196,6 @@ class Calculator:
         
         # Variable to store current expression
         self.expression = ""
-        self.equation = tk.StringVar()
         self.result_shown = False
 
         # Custom Fonts
@@ -23,6 +207,11 @@ class Calculator:
         self.create_buttons()
         self.create_bindings()
 
+    @staticmethod
+    def evaluate_batch(expressions):
+        """Evaluate a list of expressions without the UI (batch/test mode)"""
+        return evaluate_batch(expressions)
+
     def create_display(self):
         # Display Frame
         display_frame = tk.Frame(self.root, bg="#202020", height=100)
@@ -31,7 +220,7 @@ class Calculator:
         # Label for the expression/result
         self.label = tk.Label(
             display_frame, 
-            textvariable=self.equation, 
+            text="0", 
             anchor="e", 
             bg="#202020", 
             fg="white", 
@@ -39,7 +228,6 @@ class Calculator:
             font=self.display_font
         )
         self.label.pack(expand=True, fill="both", side="bottom")
-        self.equation.set("0")
 
     def create_buttons(self):
         # Button layout configuration
@@ -55,33 +243,33 @@ class Calculator:
         # Button definitions (text, row, col, function, style_type)
         # Styles: 0=Number/Dot (Black/DarkGrey), 1=Operator (Grey), 2=Equals (Blue/Accent)
         buttons = [
-            ('%', 0, 0, lambda: self.on_operation('%'), 1),
+            ('%', 0, 0, partial(self.on_operation, '%'), 1),
             ('CE', 0, 1, self.clear_entry, 1),
             ('C', 0, 2, self.clear_all, 1),
             ('⌫', 0, 3, self.backspace, 1),
 
-            ('1/x', 1, 0, lambda: self.on_unary('reciprocal'), 1),
-            ('x²', 1, 1, lambda: self.on_unary('square'), 1),
-            ('√x', 1, 2, lambda: self.on_unary('sqrt'), 1),
-            ('÷', 1, 3, lambda: self.on_operation('/'), 1),
+            ('1/x', 1, 0, partial(self.on_unary, 'reciprocal'), 1),
+            ('x²', 1, 1, partial(self.on_unary, 'square'), 1),
+            ('√x', 1, 2, partial(self.on_unary, 'sqrt'), 1),
+            ('÷', 1, 3, partial(self.on_operation, '/'), 1),
 
-            ('7', 2, 0, lambda: self.add_digit('7'), 0),
-            ('8', 2, 1, lambda: self.add_digit('8'), 0),
-            ('9', 2, 2, lambda: self.add_digit('9'), 0),
-            ('×', 2, 3, lambda: self.on_operation('*'), 1),
+            ('7', 2, 0, partial(self.add_digit, '7'), 0),
+            ('8', 2, 1, partial(self.add_digit, '8'), 0),
+            ('9', 2, 2, partial(self.add_digit, '9'), 0),
+            ('×', 2, 3, partial(self.on_operation, '*'), 1),
 
-            ('4', 3, 0, lambda: self.add_digit('4'), 0),
-            ('5', 3, 1, lambda: self.add_digit('5'), 0),
-            ('6', 3, 2, lambda: self.add_digit('6'), 0),
-            ('-', 3, 3, lambda: self.on_operation('-'), 1),
+            ('4', 3, 0, partial(self.add_digit, '4'), 0),
+            ('5', 3, 1, partial(self.add_digit, '5'), 0),
+            ('6', 3, 2, partial(self.add_digit, '6'), 0),
+            ('-', 3, 3, partial(self.on_operation, '-'), 1),
 
-            ('1', 4, 0, lambda: self.add_digit('1'), 0),
-            ('2', 4, 1, lambda: self.add_digit('2'), 0),
-            ('3', 4, 2, lambda: self.add_digit('3'), 0),
-            ('+', 4, 3, lambda: self.on_operation('+'), 1),
+            ('1', 4, 0, partial(self.add_digit, '1'), 0),
+            ('2', 4, 1, partial(self.add_digit, '2'), 0),
+            ('3', 4, 2, partial(self.add_digit, '3'), 0),
+            ('+', 4, 3, partial(self.on_operation, '+'), 1),
 
             ('+/-', 5, 0, self.negate, 0),
-            ('0', 5, 1, lambda: self.add_digit('0'), 0),
+            ('0', 5, 1, partial(self.add_digit, '0'), 0),
             ('.', 5, 2, self.add_decimal, 0),
             ('=', 5, 3, self.calculate, 2),
         ]
@@ -112,60 +300,51 @@ class Calculator:
             btn.configure(bg=bg_color, fg=fg_color, activebackground=hover_color, activeforeground=fg_color)
             btn.grid(row=row, column=col, sticky="nsew", padx=1, pady=1)
 
-            # Hover effects
-            def on_enter(e, bg=hover_color):
-                e.widget['background'] = bg
-            def on_leave(e, bg=bg_color):
-                e.widget['background'] = bg
-            
-            btn.bind("<Enter>", on_enter)
-            btn.bind("<Leave>", on_leave)
+            # Hover effects (colors are stored on the button for the shared handlers)
+            btn._hover_bg = hover_color
+            btn._base_bg = bg_color
+            btn.bind("<Enter>", _on_enter)
+            btn.bind("<Leave>", _on_leave)
 
     def create_bindings(self):
-        self.root.bind('<Return>', lambda e: self.calculate())
-        self.root.bind('<BackSpace>', lambda e: self.backspace())
-        self.root.bind('<Escape>', lambda e: self.clear_all())
-        for key in '0123456789':
-            self.root.bind(key, lambda e, k=key: self.add_digit(k))
-        self.root.bind('.', lambda e: self.add_decimal())
-        self.root.bind('+', lambda e: self.on_operation('+'))
-        self.root.bind('-', lambda e: self.on_operation('-'))
-        self.root.bind('*', lambda e: self.on_operation('*'))
-        self.root.bind('/', lambda e: self.on_operation('/'))
+        # One <Key> binding dispatched through _KEYMAP instead of a binding per key
+        self.root.bind('<Key>', self._dispatch_key)
+
+    def _dispatch_key(self, event):
+        command = self._KEYMAP.get(event.char) or self._KEYMAP.get(event.keysym)
+        if command is not None:
+            name, args = command
+            getattr(self, name)(*args)
 
     def format_result(self, value):
         """Format result to fit display with appropriate rounding"""
-        if isinstance(value, (int, float)):
-            # If it's an integer or has no decimal part, show as integer
-            if isinstance(value, float) and value.is_integer():
+        cls = value.__class__
+        if cls is float:
+            # If it has no decimal part, show as integer
+            if value % 1 == 0.0:
                 return str(int(value))
-            
-            # For very large or very small numbers, use scientific notation
-            if abs(value) >= 1e10 or (abs(value) < 1e-4 and value != 0):
-                formatted = f"{value:.6e}"
-                return formatted
-            
-            # For regular numbers, limit to 10 significant figures
-            # This ensures it fits nicely on the display
-            str_val = str(value)
-            if len(str_val) > 12:  # Limit display length
-                # Round to 10 decimal places
-                formatted = f"{value:.10g}"
-                return formatted
-            
-            return str_val
-        return str(value)
+        elif cls is not int:
+            return str(value)
+
+        # For very large or very small numbers, use scientific notation
+        av = abs(value)
+        if av >= 1e10 or (av < 1e-4 and value != 0):
+            return f"{value:.6e}"
+
+        # For regular numbers, limit to 10 significant figures
+        # This ensures it fits nicely on the display
+        return f"{value:.10g}"
 
     def add_digit(self, digit):
         if self.result_shown:
             self.expression = digit
             self.result_shown = False
+        elif self.expression != "0":
+            # Most common case: appending to a number already being typed
+            self.expression += digit
         else:
-            if self.expression == "0":
-                self.expression = digit
-            else:
-                self.expression += digit
-        self.equation.set(self.expression)
+            self.expression = digit
+        self.label.configure(text=self.expression)
 
     def add_decimal(self):
         if self.result_shown:
@@ -173,7 +352,7 @@ class Calculator:
             self.result_shown = False
         elif "." not in self.expression.split()[-1] if self.expression else True:
              self.expression += "."
-        self.equation.set(self.expression)
+        self.label.configure(text=self.expression)
 
     def on_operation(self, operator):
         if self.result_shown:
@@ -184,14 +363,22 @@ class Calculator:
             self.expression = self.expression[:-1] + operator
         else:
             self.expression += operator
-        self.equation.set(self.expression)
+        self.label.configure(text=self.expression)
+
+    def _current_value(self):
+        """Numeric value of the current expression"""
+        # After "=" the expression is a plain number, so skip parsing entirely
+        try:
+            return float(self.expression)
+        except ValueError:
+            return float(evaluate(self.expression))
 
     def on_unary(self, operation):
         try:
-            val = float(eval(self.expression))
+            val = self._current_value()
             if operation == 'reciprocal':
                 if val == 0:
-                    self.equation.set("Cannot divide by zero")
+                    self.label.configure(text="Cannot divide by zero")
                     self.expression = ""
                     self.result_shown = True
                     return
@@ -200,7 +387,7 @@ class Calculator:
                 res = val ** 2
             elif operation == 'sqrt':
                 if val < 0:
-                    self.equation.set("Invalid Input")
+                    self.label.configure(text="Invalid Input")
                     self.expression = ""
                     self.result_shown = True
                     return
@@ -208,10 +395,10 @@ class Calculator:
             
             # Format result to fit display
             self.expression = self.format_result(res)
-            self.equation.set(self.expression)
+            self.label.configure(text=self.expression)
             self.result_shown = True
         except Exception:
-            self.equation.set("Error")
+            self.label.configure(text="Error")
             self.expression = ""
             self.result_shown = True
 
@@ -220,10 +407,10 @@ class Calculator:
             try:
                 # Simple negation for current number logic could be complex with full expression
                 # For simplicity, we'll just evaluate and negate
-                val = float(eval(self.expression))
+                val = self._current_value()
                 val = -val
                 self.expression = self.format_result(val)
-                self.equation.set(self.expression)
+                self.label.configure(text=self.expression)
             except:
                 pass
 
@@ -231,11 +418,11 @@ class Calculator:
         # Clears the last entry (number)
         # Simplified: just clear all for now or implement complex parsing
         self.expression = "0"
-        self.equation.set(self.expression)
+        self.label.configure(text=self.expression)
 
     def clear_all(self):
         self.expression = "0"
-        self.equation.set(self.expression)
+        self.label.configure(text=self.expression)
         self.result_shown = False
 
     def backspace(self):
@@ -246,7 +433,7 @@ class Calculator:
             self.expression = self.expression[:-1]
             if not self.expression:
                 self.expression = "0"
-        self.equation.set(self.expression)
+        self.label.configure(text=self.expression)
 
     def calculate(self):
         try:
@@ -255,19 +442,19 @@ class Calculator:
             # but let's be safe
             safe_expr = self.expression.replace('×', '*').replace('÷', '/')
             
-            # Eval is dangerous in general but okay for a local calculator app
-            result = eval(safe_expr)
+            # Parsed ASTs are cached per expression, so repeated "=" presses are cheap
+            result = evaluate(safe_expr)
             
             # Format result to fit display
             self.expression = self.format_result(result)
-            self.equation.set(self.expression)
+            self.label.configure(text=self.expression)
             self.result_shown = True
         except ZeroDivisionError:
-            self.equation.set("Cannot divide by zero")
+            self.label.configure(text="Cannot divide by zero")
             self.expression = ""
             self.result_shown = True
         except Exception:
-            self.equation.set("Error")
+            self.label.configure(text="Error")
             self.expression = ""
             self.result_shown = True
 
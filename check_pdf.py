@@ -2,8 +2,17 @@ import os
 try:
     import pypdf
     with open(r"c:\Users\44743\Desktop\LinUK - Study Materials.pdf", "rb") as f:
-        reader = pypdf.PdfReader(f)
-        print(f"PDF Pages: {len(reader.pages)}")
+        reader = pypdf.PdfReader(f, strict=False)
+        # The root Pages node stores the total page count, so read it directly
+        # instead of walking the whole page tree
+        pages = reader.trailer['/Root']['/Pages']
+        count = pages.get('/Count')
+        if count is None:
+            count = len(reader.pages)
+        else:
+            # /Count may be an indirect reference to the number
+            count = int(count.get_object())
+        print(f"PDF Pages: {count}")
 except ImportError:
     print("pypdf not installed.")
 except Exception as e:
@@ -0,0 +1,6 @@
+# Picked up automatically by gunicorn when started from this directory (see Procfile)
+
+def post_worker_init(worker):
+    """Register the static-file rescan on SIGHUP in each worker's main thread."""
+    import server
+    server.install_sighup_handler()
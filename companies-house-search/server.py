@@ -9,20 +9,90 @@ API keys are stored securely in environment variables and never exposed to the c
 Security hardened with input validation, CORS restrictions, and SSRF protection.
 """
 
+# When run directly the app is served by gevent (see the bottom of this file).
+# Sockets must be patched before requests/urllib3 are imported so that upstream
+# calls yield to other in-flight requests instead of blocking the process.
+if __name__ == '__main__':
+    from gevent import monkey
+    monkey.patch_all()
+
 from flask import Flask, request, jsonify, send_from_directory, Response
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
-from werkzeug.utils import safe_join
+import orjson
 import requests
-import base64
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import atexit
+import binascii
+import logging
+import queue
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 import os
 import re
+import signal
+import threading
+import time
+from cachetools import TLRUCache
 from dotenv import load_dotenv
-from urllib.parse import urlparse
+from urllib.parse import urlencode, urlparse
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Logging: records are handed to a queue and written to stdout by a background
+# listener, so handlers never block on console I/O. Use %-style arguments so
+# messages below LOG_LEVEL (e.g. per-request DEBUG lines) are never formatted.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+_INVALID_LOG_LEVEL = None
+if not isinstance(logging.getLevelName(LOG_LEVEL), int):
+    # Fall back rather than fail at import; warned about once the logger exists
+    _INVALID_LOG_LEVEL, LOG_LEVEL = LOG_LEVEL, 'INFO'
+
+def _configure_logging():
+    """Create the proxy's logger with a queue-backed stdout handler."""
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    proxy_logger = logging.getLogger('companies_house_proxy')
+    proxy_logger.addHandler(QueueHandler(log_queue))
+    proxy_logger.setLevel(LOG_LEVEL)
+    proxy_logger.propagate = False
+    return proxy_logger
+
+logger = _configure_logging()
+if _INVALID_LOG_LEVEL:
+    logger.warning('Unknown LOG_LEVEL %r, using INFO', _INVALID_LOG_LEVEL)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, used by every jsonify() call."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Compression: officer lists, filing histories and search results are tens of KB
+# of repetitive JSON, so gzip anything over 500 bytes. Level 6 is the usual
+# size/CPU balance. Static pages, CSS and JS go through _send_static so they are
+# compressed too. PDF documents are streamed and left alone.
+app.config['COMPRESS_MIMETYPES'] = [
+    'application/json', 'text/html', 'text/css', 'application/javascript', 'text/javascript',
+]
+app.config['COMPRESS_ALGORITHM'] = 'gzip'
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_MIN_SIZE'] = 500
+Compress(app)
 
 # SECURITY: Restrict CORS origins. 
 # In production, set ALLOWED_ORIGINS environment variable.
@@ -47,16 +117,64 @@ GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY')
 
 # Validate that required API key is present
 if not COMPANIES_HOUSE_API_KEY:
-    print("WARNING: COMPANIES_HOUSE_API_KEY not found in environment variables!")
-    print("Please create a .env file with your API key. See .env.example for template.")
+    logger.warning("COMPANIES_HOUSE_API_KEY not found in environment variables!")
+    logger.warning("Please create a .env file with your API key. See .env.example for template.")
+
+# Routes under /api/ that don't call Companies House
+_API_KEY_EXEMPT_PATHS = frozenset({'/api/health', '/api/maps/embed-url'})
+
+@app.before_request
+def require_server_api_key():
+    """
+    Reject Companies House routes up front when the server has no API key,
+    before any parameter validation or handler work is done.
+    """
+    if (not COMPANIES_HOUSE_API_KEY and request.path.startswith('/api/')
+            and request.path not in _API_KEY_EXEMPT_PATHS and request.method != 'OPTIONS'):
+        return jsonify({'error': 'Server configuration error'}), 500
+
+# Authentication: Companies House uses the API key as the username and an empty password.
+# Keys change rarely (only on rotation), so each key's Basic Auth header is encoded once.
+@lru_cache(maxsize=256)
+def _auth_header(api_key):
+    """Build the Basic Auth header value for a Companies House API key."""
+    return 'Basic ' + binascii.b2a_base64(f'{api_key}:'.encode(), newline=False).decode('ascii')
 
 # The base URL for all Companies House API requests
 API_BASE_URL = 'https://api.company-information.service.gov.uk'
 # The base URL for the Companies House Document API
 DOCUMENT_API_BASE_URL = 'https://document-api.company-information.service.gov.uk'
+# Documents are streamed to the client in 64KB chunks and capped at 50MB
+DOCUMENT_CHUNK_SIZE = 64 * 1024
+MAX_DOCUMENT_SIZE = 50 * 1024 * 1024
+
+# Shared HTTP session so TCP/TLS connections to Companies House are pooled and
+# kept alive across requests instead of being re-established for every call.
+# Transient gateway errors are retried briefly before being reported upstream.
+# API lookups are retried once and never after a read timeout, so a failing
+# upstream costs at most about 11 s (two 5 s reads, no Retry-After sleeps) before the
+# stale fallback or an error is served; documents keep the longer policy.
+_SESSION = requests.Session()
+_SESSION.mount(API_BASE_URL, HTTPAdapter(
+    pool_connections=50,
+    pool_maxsize=200,
+    max_retries=Retry(total=1, read=0, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                      raise_on_status=False, respect_retry_after_header=False),
+))
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=50,
+    pool_maxsize=200,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), raise_on_status=False),
+))
+
+# (connect, read) timeouts: fail fast when Companies House is unreachable, while
+# allowing document downloads longer to stream
+API_TIMEOUT = (3.05, 5)
+DOCUMENT_TIMEOUT = (3.05, 60)
 
 # SECURITY FIX #2: Whitelist of allowed API endpoints to prevent SSRF
-ALLOWED_ENDPOINTS = [
+# Patterns are compiled once at import rather than looked up on every request.
+_ALLOWED_ENDPOINTS = [re.compile(p) for p in (
     r'^/company/[A-Z0-9]{8,}$',
     r'^/company/[A-Z0-9]{8,}/persons-with-significant-control$',
     r'^/company/[A-Z0-9]{8,}/filing-history$',
@@ -65,16 +183,17 @@ ALLOWED_ENDPOINTS = [
     r'^/search/companies$',
     r'^/search/officers$',
     r'^/officers/[a-zA-Z0-9_-]+/appointments$',
-]
+)]
+
+# SECURITY FIX #7: Input formats accepted by the proxy routes
+_COMPANY_NUMBER_RE = re.compile(r'^[A-Z0-9]{6,8}$', re.IGNORECASE)
+_ID_RE = re.compile(r'^[a-zA-Z0-9_-]{1,100}$')
 
 def validate_endpoint(endpoint):
     """
     SECURITY: Validate that the endpoint matches allowed patterns to prevent SSRF.
     """
-    for pattern in ALLOWED_ENDPOINTS:
-        if re.match(pattern, endpoint):
-            return True
-    return False
+    return any(pattern.match(endpoint) for pattern in _ALLOWED_ENDPOINTS)
 
 def sanitize_integer_param(value, default, min_val=1, max_val=1000):
     """
@@ -87,7 +206,189 @@ def sanitize_integer_param(value, default, min_val=1, max_val=1000):
     except (ValueError, TypeError):
         return default
 
-def ch_api_request(endpoint, query_params=None):
+# ========================================
+# RESPONSE CACHE
+# ========================================
+
+# Successful upstream responses are cached, keyed by endpoint and query
+# parameters, so repeated lookups of the same company/search skip the upstream
+# round trip. Each resource has a cache policy (short/normal/long TTL); an
+# upstream Cache-Control max-age takes precedence when present.
+# With REDIS_URL set the cache lives in Redis and is shared by all workers
+# (configure the Redis instance with maxmemory-policy allkeys-lfu); otherwise
+# each worker keeps its own in-process cache.
+CACHE_TTL_SHORT = int(os.getenv('CACHE_TTL_SHORT', 60))
+CACHE_TTL_NORMAL = int(os.getenv('CACHE_TTL_NORMAL', 300))
+CACHE_TTL_LONG = int(os.getenv('CACHE_TTL_LONG', 3600))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+REDIS_URL = os.getenv('REDIS_URL')
+
+# Stale fallback: when enabled, a second copy of each cached response is kept for
+# CACHE_STALE_TTL and served (marked X-Cache: STALE) if Companies House times out,
+# is unreachable or returns a 5xx error.
+CACHE_FALLBACK_ENABLED = os.getenv('CACHE_FALLBACK_ENABLED', 'False').lower() == 'true'
+CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', 24 * 3600))
+# Warm-up: comma-separated company searches fetched in the background at startup and
+# refreshed every CACHE_WARM_INTERVAL seconds, so popular queries are served from cache
+CACHE_WARM_QUERIES = tuple(q.strip() for q in os.getenv('CACHE_WARM_QUERIES', '').split(',') if q.strip())
+CACHE_WARM_INTERVAL = int(os.getenv('CACHE_WARM_INTERVAL', max(CACHE_TTL_SHORT // 2, 1)))
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+class _MemoryCache:
+    """
+    In-process response cache; each entry expires after its own TTL.
+    get/get_many return (body, status, seconds left) so HITs advertise the
+    entry's remaining lifetime rather than the resource's default TTL.
+    """
+
+    def __init__(self, maxsize):
+        # Values are (body, status code, ttl, time stored)
+        self._fresh = TLRUCache(maxsize=maxsize, ttu=lambda _key, value, now: now + value[2])
+        self._stale = TLRUCache(maxsize=maxsize, ttu=lambda _key, value, now: now + value[2])
+        self._lock = threading.Lock()
+
+    def _remaining(self, entry):
+        if entry is None:
+            return None
+        body, status, ttl, stored = entry
+        return body, status, max(0, int(stored + ttl - time.monotonic()))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._fresh.get(key)
+        return self._remaining(entry)
+
+    def get_stale(self, key):
+        with self._lock:
+            entry = self._stale.get(key)
+        return None if entry is None else entry[:2]
+
+    def get_many(self, keys):
+        with self._lock:
+            entries = [self._fresh.get(key) for key in keys]
+        return [self._remaining(entry) for entry in entries]
+
+    def set(self, key, body, status, ttl):
+        now = time.monotonic()
+        with self._lock:
+            self._fresh[key] = (body, status, ttl, now)
+            if CACHE_FALLBACK_ENABLED:
+                self._stale[key] = (body, status, CACHE_STALE_TTL, now)
+
+class _RedisCache:
+    """
+    Redis response cache; each entry is a hash of body, status and timestamp
+    stored under ch:fresh:<key> (and ch:stale:<key> for the stale fallback).
+    """
+
+    def __init__(self, url):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+
+    def _read_many(self, redis_keys):
+        # HMGET plus TTL per key in one round trip; entries are (body, status, seconds left).
+        # A Redis outage degrades to a cache miss rather than an error
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for redis_key in redis_keys:
+                pipe.hmget(redis_key, 'body', 'status')
+                pipe.ttl(redis_key)
+            results = pipe.execute()
+        except self._errors:
+            return [None] * len(redis_keys)
+        return [None if body is None else (body, int(status), max(0, ttl))
+                for (body, status), ttl in zip(results[::2], results[1::2])]
+
+    def get(self, key):
+        return self._read_many(['ch:fresh:' + key])[0]
+
+    def get_stale(self, key):
+        entry = self._read_many(['ch:stale:' + key])[0]
+        return None if entry is None else entry[:2]
+
+    def get_many(self, keys):
+        return self._read_many(['ch:fresh:' + key for key in keys])
+
+    def set(self, key, body, status, ttl):
+        entry = {'body': body, 'status': status, 'timestamp': int(time.time())}
+        try:
+            pipe = self._redis.pipeline()
+            pipe.hset('ch:fresh:' + key, mapping=entry)
+            pipe.expire('ch:fresh:' + key, ttl)
+            if CACHE_FALLBACK_ENABLED:
+                pipe.hset('ch:stale:' + key, mapping=entry)
+                pipe.expire('ch:stale:' + key, CACHE_STALE_TTL)
+            pipe.execute()
+        except self._errors:
+            pass
+
+class _NullCache:
+    """Stand-in used when in-app caching is disabled (CACHE_ENABLED=false)."""
+
+    def get(self, key):
+        return None
+
+    def get_stale(self, key):
+        return None
+
+    def get_many(self, keys):
+        return [None] * len(keys)
+
+    def set(self, key, body, status, ttl):
+        pass
+
+# Behind an HTTP cache (Nginx proxy_cache, a CDN) that honors the Cache-Control
+# headers set on proxy responses, repeats never reach the app, so the in-app
+# cache can be turned off rather than caching everything twice
+CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'True').lower() == 'true'
+
+if not CACHE_ENABLED:
+    _CACHE = _NullCache()
+elif REDIS_URL:
+    _CACHE = _RedisCache(REDIS_URL)
+else:
+    _CACHE = _MemoryCache(CACHE_MAX_ENTRIES)
+
+def _cache_key(endpoint, query_params):
+    """Normalize an upstream request into a cache key (endpoint plus sorted query string)."""
+    return f"{endpoint}?{urlencode(sorted((query_params or {}).items()))}"
+
+def _cache_ttl(response, default_ttl):
+    """
+    Work out how long an upstream response may be cached for.
+    Honors Cache-Control no-store/no-cache/max-age; returns 0 when not cacheable.
+    """
+    cache_control = response.headers.get('Cache-Control', '')
+    if 'no-store' in cache_control or 'no-cache' in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else default_ttl
+
+def _cached_response(body, status, cache_status, content_type='application/json', max_age=None):
+    """
+    Build a proxy response from cached or freshly fetched bytes without re-encoding them.
+    max_age, when given, lets browsers and shared HTTP caches reuse the response.
+    """
+    response = Response(body, status=status, content_type=content_type)
+    response.headers['X-Cache'] = cache_status
+    if max_age:
+        response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    return response
+
+def _stale_fallback(key):
+    """Return the stale cached response for key if the fallback is enabled and one exists."""
+    if not CACHE_FALLBACK_ENABLED or key is None:
+        return None
+    stale = _CACHE.get_stale(key)
+    if stale is None:
+        return None
+    response = _cached_response(stale[0], stale[1], 'STALE')
+    # Don't let downstream caches hold on to an outdated copy
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def ch_api_request(endpoint, query_params=None, cache_ttl=CACHE_TTL_NORMAL, refresh=False):
     """
     Helper function to make requests to the Companies House API.
     Uses the API key from environment variables (server-side only).
@@ -95,29 +396,33 @@ def ch_api_request(endpoint, query_params=None):
     Args:
         endpoint (str): The API endpoint to call (e.g., '/search/companies').
         query_params (dict): Optional dictionary of query parameters.
+        cache_ttl (int): Seconds a successful response may be cached for.
+        refresh (bool): Skip the cache lookup and always refetch (cache warm-up).
         
     Returns:
-        tuple: (JSON response, status code)
+        Response or tuple: The upstream JSON response, or (JSON error, status code)
     """
+    key = None
     try:
-        # Use server-side API key from environment
-        if not COMPANIES_HOUSE_API_KEY:
-            return jsonify({'error': 'Server configuration error'}), 500
-
         # SECURITY FIX #2: Validate endpoint to prevent SSRF
         if not validate_endpoint(endpoint):
             return jsonify({'error': 'Invalid endpoint requested'}), 400
 
-        # Authentication: Prepare Basic Auth header
-        # Companies House uses the API key as the username and an empty password
-        auth_string = base64.b64encode(f'{COMPANIES_HOUSE_API_KEY}:'.encode()).decode()
-        headers = {'Authorization': f'Basic {auth_string}'}
+        # Cache: Serve repeated requests without going upstream
+        key = _cache_key(endpoint, query_params)
+        cached = None if refresh else _CACHE.get(key)
+        if cached is not None:
+            logger.debug('Cache hit %s', key)
+            # Advertise only what is left of the entry's TTL, not the resource default
+            return _cached_response(cached[0], cached[1], 'HIT', max_age=cached[2])
 
         # Request: Send the request to Companies House
         url = f'{API_BASE_URL}{endpoint}'
         
         # SECURITY: Set timeout to prevent hanging requests
-        response = requests.get(url, params=query_params, headers=headers, timeout=30)
+        headers = {'Authorization': _auth_header(COMPANIES_HOUSE_API_KEY)}
+        response = _SESSION.get(url, params=query_params, headers=headers, timeout=API_TIMEOUT)
+        logger.debug('Upstream %s params=%s -> %s', endpoint, query_params, response.status_code)
         
         # Error Handling: Check for specific status codes
         if response.status_code == 401:
@@ -125,17 +430,41 @@ def ch_api_request(endpoint, query_params=None):
         
         if response.status_code == 404:
             return jsonify({'error': 'Resource not found'}), 404
+
+        # Upstream outage: serve the last good response if we still have one
+        if response.status_code >= 500:
+            stale = _stale_fallback(key)
+            if stale is not None:
+                return stale
             
-        # Success: Return the raw JSON and the original status code
-        return jsonify(response.json()), response.status_code
+        # Only successful responses are cached
+        ttl = 0
+        if response.status_code == 200:
+            ttl = _cache_ttl(response, cache_ttl)
+            if ttl > 0:
+                _CACHE.set(key, response.content, response.status_code, ttl)
+
+        # Success: Pass the upstream body through untouched with the original status code
+        # and content type (error bodies such as rate-limit pages aren't always JSON)
+        content_type = response.headers.get('Content-Type', 'application/json')
+        return _cached_response(response.content, response.status_code, 'MISS', content_type, ttl)
 
     except requests.exceptions.Timeout:
+        logger.warning('Upstream timeout for %s', endpoint)
+        stale = _stale_fallback(key)
+        if stale is not None:
+            return stale
         # SECURITY FIX #5: Don't expose internal error details
         return jsonify({'error': 'Request timeout'}), 504
-    except requests.exceptions.RequestException:
+    except requests.exceptions.RequestException as e:
+        logger.warning('Upstream request failed for %s: %s', endpoint, e)
+        stale = _stale_fallback(key)
+        if stale is not None:
+            return stale
         return jsonify({'error': 'External service error'}), 502
     except Exception:
         # SECURITY FIX #5: Generic error message, log internally
+        logger.exception('Unexpected error proxying %s', endpoint)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -143,139 +472,115 @@ def ch_api_request(endpoint, query_params=None):
 # API PROXY ROUTES
 # ========================================
 
-@app.route('/api/company/<company_number>', methods=['GET'])
-def get_company_profile(company_number):
-    """Route for retrieving full company profile."""
-    # SECURITY FIX #7: Validate company number format
-    if not re.match(r'^[A-Z0-9]{6,8}$', company_number, re.IGNORECASE):
-        return jsonify({'error': 'Invalid company number format'}), 400
-    return ch_api_request(f'/company/{company_number.upper()}')
-
-@app.route('/api/company/<company_number>/persons-with-significant-control', methods=['GET'])
-def get_company_pscs(company_number):
-    """Route for retrieving persons with significant control."""
-    if not re.match(r'^[A-Z0-9]{6,8}$', company_number, re.IGNORECASE):
-        return jsonify({'error': 'Invalid company number format'}), 400
-    
-    params = {
-        'items_per_page': sanitize_integer_param(request.args.get('items_per_page', 100), 100),
-        'start_index': sanitize_integer_param(request.args.get('start_index', 0), 0, 0, 10000)
+# Proxied Companies House resources, keyed by their path below /api/ with '{}'
+# standing in for the identifier segment:
+#   (identifier pattern, invalid identifier message, upper-case identifier,
+#    default items_per_page, cache TTL)
+# Resources without an identifier are searches and require a 'q' parameter.
+# A default items_per_page of None means the resource is not paginated.
+_PROXY_RESOURCES = {
+    'company/{}': (_COMPANY_NUMBER_RE, 'Invalid company number format', True, None, CACHE_TTL_LONG),
+    'company/{}/persons-with-significant-control': (_COMPANY_NUMBER_RE, 'Invalid company number format', True, 100, CACHE_TTL_NORMAL),
+    'company/{}/filing-history': (_COMPANY_NUMBER_RE, 'Invalid company number format', True, 100, CACHE_TTL_NORMAL),
+    'company/{}/charges': (_COMPANY_NUMBER_RE, 'Invalid company number format', True, 100, CACHE_TTL_LONG),
+    'company/{}/officers': (_COMPANY_NUMBER_RE, 'Invalid company number format', True, 100, CACHE_TTL_NORMAL),
+    'officers/{}/appointments': (_ID_RE, 'Invalid officer ID format', False, 100, CACHE_TTL_NORMAL),
+    'search/companies': (None, None, False, 20, CACHE_TTL_SHORT),
+    'search/officers': (None, None, False, 20, CACHE_TTL_SHORT),
+}
+
+def _paging(args, default_items):
+    """Build the sanitized pagination parameters for a paginated resource."""
+    get = args.get
+    return {
+        'items_per_page': sanitize_integer_param(get('items_per_page', default_items), default_items),
+        'start_index': sanitize_integer_param(get('start_index', 0), 0, 0, 10000)
     }
-    return ch_api_request(f'/company/{company_number.upper()}/persons-with-significant-control', params)
 
-@app.route('/api/company/<company_number>/filing-history', methods=['GET'])
-def get_filing_history(company_number):
-    """Route for retrieving company filing history."""
-    if not re.match(r'^[A-Z0-9]{6,8}$', company_number, re.IGNORECASE):
-        return jsonify({'error': 'Invalid company number format'}), 400
-    
-    params = {
-        'items_per_page': sanitize_integer_param(request.args.get('items_per_page', 100), 100),
-        'start_index': sanitize_integer_param(request.args.get('start_index', 0), 0, 0, 10000)
-    }
-    return ch_api_request(f'/company/{company_number.upper()}/filing-history', params)
-
-@app.route('/api/company/<company_number>/charges', methods=['GET'])
-def get_company_charges(company_number):
-    """Route for retrieving company charges (mortgages)."""
-    if not re.match(r'^[A-Z0-9]{6,8}$', company_number, re.IGNORECASE):
-        return jsonify({'error': 'Invalid company number format'}), 400
-    
-    params = {
-        'items_per_page': sanitize_integer_param(request.args.get('items_per_page', 100), 100),
-        'start_index': sanitize_integer_param(request.args.get('start_index', 0), 0, 0, 10000)
-    }
-    return ch_api_request(f'/company/{company_number.upper()}/charges', params)
-
-@app.route('/api/search/companies', methods=['GET'])
-def search_companies():
-    """Route for searching companies by name or number."""
-    query = request.args.get('q', '').strip()
-    if not query:
-        return jsonify({'error': 'Search query is required'}), 400
-    
-    # SECURITY FIX #7: Limit query length to prevent abuse
-    if len(query) > 200:
-        return jsonify({'error': 'Search query too long'}), 400
-        
-    params = {
-        'q': query,
-        'items_per_page': sanitize_integer_param(request.args.get('items_per_page', 20), 20),
-        'start_index': sanitize_integer_param(request.args.get('start_index', 0), 0, 0, 10000)
-    }
-    
-    return ch_api_request('/search/companies', params)
-
-@app.route('/api/company/<company_number>/officers', methods=['GET'])
-def get_officers(company_number):
-    """Route for retrieving officers of a specific company."""
-    if not re.match(r'^[A-Z0-9]{6,8}$', company_number, re.IGNORECASE):
-        return jsonify({'error': 'Invalid company number format'}), 400
-    
-    params = {
-        'items_per_page': sanitize_integer_param(request.args.get('items_per_page', 100), 100),
-        'start_index': sanitize_integer_param(request.args.get('start_index', 0), 0, 0, 10000)
-    }
-    
-    return ch_api_request(f'/company/{company_number.upper()}/officers', params)
-
-@app.route('/api/search/officers', methods=['GET'])
-def search_officers():
-    """Route for searching corporate officers by name."""
-    query = request.args.get('q', '').strip()
-    if not query:
-        return jsonify({'error': 'Search query is required'}), 400
-    
-    # SECURITY FIX #7: Limit query length
-    if len(query) > 200:
-        return jsonify({'error': 'Search query too long'}), 400
-        
-    params = {
-        'q': query,
-        'items_per_page': sanitize_integer_param(request.args.get('items_per_page', 20), 20),
-        'start_index': sanitize_integer_param(request.args.get('start_index', 0), 0, 0, 10000)
-    }
-    
-    return ch_api_request('/search/officers', params)
-
-@app.route('/api/officers/<officer_id>/appointments', methods=['GET'])
-def get_officer_appointments(officer_id):
-    """Route for retrieving all company appointments for a specific officer."""
-    # SECURITY FIX #7: Validate officer ID format
-    if not re.match(r'^[a-zA-Z0-9_-]{1,100}$', officer_id):
-        return jsonify({'error': 'Invalid officer ID format'}), 400
-    
-    params = {
-        'items_per_page': sanitize_integer_param(request.args.get('items_per_page', 100), 100),
-        'start_index': sanitize_integer_param(request.args.get('start_index', 0), 0, 0, 10000)
-    }
-    
-    return ch_api_request(f'/officers/{officer_id}/appointments', params)
+def proxy_resource(resource, identifier=None):
+    """
+    Route for all read-only Companies House resources in _PROXY_RESOURCES:
+    company profile, PSCs, filing history, charges, officers, officer
+    appointments and the company/officer searches.
+    """
+    pattern, invalid_message, upper, default_items, cache_ttl = _PROXY_RESOURCES[resource]
+    # Resolve the request-context proxy once per request
+    args = request.args
+
+    if pattern is None:
+        query = args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Search query is required'}), 400
+
+        # SECURITY FIX #7: Limit query length to prevent abuse
+        if len(query) > 200:
+            return jsonify({'error': 'Search query too long'}), 400
+
+        params = {'q': query, **_paging(args, default_items)}
+        return ch_api_request(f'/{resource}', params, cache_ttl)
+
+    # SECURITY FIX #7: Validate company number / officer ID format
+    if not pattern.match(identifier):
+        return jsonify({'error': invalid_message}), 400
+    if upper:
+        identifier = identifier.upper()
+
+    params = _paging(args, default_items) if default_items else None
+    return ch_api_request('/' + resource.format(identifier), params, cache_ttl)
+
+for _resource in _PROXY_RESOURCES:
+    app.add_url_rule(
+        '/api/' + _resource.replace('{}', '<identifier>'),
+        endpoint=f'proxy:{_resource}',
+        view_func=proxy_resource,
+        methods=['GET'],
+        defaults={'resource': _resource},
+    )
+
+def warm_search_cache():
+    """
+    Fetch any CACHE_WARM_QUERIES company searches that aren't cached, or that
+    would expire before the next warm-up run, so users never see them miss.
+    """
+    _, _, _, default_items, cache_ttl = _PROXY_RESOURCES['search/companies']
+    # Same parameters (and so the same cache keys) as a first-page search from the frontend
+    searches = [{'q': query, **_paging({}, default_items)} for query in CACHE_WARM_QUERIES]
+    cached = _CACHE.get_many([_cache_key('/search/companies', params) for params in searches])
+    with app.app_context():
+        for params, entry in zip(searches, cached):
+            if entry is None or entry[2] <= CACHE_WARM_INTERVAL:
+                # Replace the entry in place, so requests keep hitting the old copy meanwhile
+                ch_api_request('/search/companies', params, cache_ttl, refresh=True)
+
+def _warm_cache_forever():
+    while True:
+        try:
+            warm_search_cache()
+        except Exception:
+            logger.exception('Cache warm-up failed')
+        time.sleep(CACHE_WARM_INTERVAL)
+
+if CACHE_WARM_QUERIES and CACHE_ENABLED and COMPANIES_HOUSE_API_KEY:
+    # A daemon thread (a greenlet once gevent has patched threading)
+    threading.Thread(target=_warm_cache_forever, name='cache-warmer', daemon=True).start()
 
 @app.route('/api/document/<document_id>/content', methods=['GET'])
 def get_document_content(document_id):
     """Route for retrieving document content from the Document API."""
     try:
-        # Use server-side API key
-        if not COMPANIES_HOUSE_API_KEY:
-            return jsonify({'error': 'Server configuration error'}), 500
-
         # SECURITY FIX #7: Validate document ID format
-        if not re.match(r'^[a-zA-Z0-9_-]{1,100}$', document_id):
+        if not _ID_RE.match(document_id):
             return jsonify({'error': 'Invalid document ID format'}), 400
 
-        accept_header = request.headers.get('Accept', '*/*')
-
-        auth_string = base64.b64encode(f'{COMPANIES_HOUSE_API_KEY}:'.encode()).decode()
         headers = {
-            'Authorization': f'Basic {auth_string}',
-            'Accept': accept_header
+            'Authorization': _auth_header(COMPANIES_HOUSE_API_KEY),
+            'Accept': request.headers.get('Accept', '*/*')
         }
 
         url = f'{DOCUMENT_API_BASE_URL}/document/{document_id}/content'
         
         # SECURITY: Set timeout and size limit
-        response = requests.get(url, headers=headers, stream=True, timeout=60)
+        response = _SESSION.get(url, headers=headers, stream=True, timeout=DOCUMENT_TIMEOUT)
         
         # Check if the request was successful
         if response.status_code != 200:
@@ -283,12 +588,11 @@ def get_document_content(document_id):
 
         # Return the response as a stream with relevant headers
         def generate():
-            # SECURITY: Limit document size to 50MB
-            max_size = 50 * 1024 * 1024
-            downloaded = 0
-            for chunk in response.iter_content(chunk_size=8192):
-                downloaded += len(chunk)
-                if downloaded > max_size:
+            # SECURITY: Limit document size to MAX_DOCUMENT_SIZE
+            remaining = MAX_DOCUMENT_SIZE
+            for chunk in response.iter_content(chunk_size=DOCUMENT_CHUNK_SIZE):
+                remaining -= len(chunk)
+                if remaining < 0:
                     break
                 yield chunk
 
@@ -300,10 +604,13 @@ def get_document_content(document_id):
         return Response(generate(), status=response.status_code, headers=headers)
 
     except requests.exceptions.Timeout:
+        logger.warning('Document API timeout for %s', document_id)
         return jsonify({'error': 'Request timeout'}), 504
-    except requests.exceptions.RequestException:
+    except requests.exceptions.RequestException as e:
+        logger.warning('Document API request failed for %s: %s', document_id, e)
         return jsonify({'error': 'External service error'}), 502
     except Exception:
+        logger.exception('Unexpected error fetching document %s', document_id)
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -352,58 +659,91 @@ def get_map_embed_url():
 # SECURITY FIX #3: Secure static file serving with path validation
 ALLOWED_EXTENSIONS = {'.html', '.css', '.js', '.json', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.woff', '.woff2', '.ttf'}
 
-def is_safe_path(base_path, path, allowed_extensions):
+def _collect_static_files(base_path, allowed_extensions):
     """
-    SECURITY: Validate that the requested path is safe.
-    Prevents directory traversal and limits to allowed file types.
+    SECURITY: Build the set of servable files under base_path.
+    Only regular files with an allowed extension are included and hidden
+    directories are skipped, so a request path is safe exactly when it is
+    a member of the returned set.
     """
-    # Use safe_join to prevent path traversal
-    try:
-        full_path = safe_join(base_path, path)
-    except:
-        return False
-    
-    # Check if file exists
-    if not os.path.isfile(full_path):
-        return False
-    
-    # Check extension
-    _, ext = os.path.splitext(full_path)
-    if ext.lower() not in allowed_extensions:
-        return False
-    
-    # Ensure the path doesn't contain suspicious patterns
-    if '..' in path or path.startswith('/'):
-        return False
-    
-    return True
+    files = set()
+    for root, dirs, filenames in os.walk(base_path):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() in allowed_extensions:
+                rel_path = os.path.relpath(os.path.join(root, name), base_path)
+                files.add(rel_path.replace(os.sep, '/'))
+    return frozenset(files)
+
+def refresh_static_files(*_):
+    """
+    Rescan the static directories (the asset set is fixed at deploy time).
+    Paths are relative to app.root_path, which send_from_directory resolves
+    against, so the server works whatever directory it is started from.
+    """
+    global _STATIC_FILES, _JS_FILES
+    _STATIC_FILES = _collect_static_files(app.root_path, ALLOWED_EXTENSIONS)
+    _JS_FILES = _collect_static_files(os.path.join(app.root_path, 'js'), ALLOWED_EXTENSIONS)
+
+refresh_static_files()
+
+# Caching: assets are served under their plain names (no content hash in the URL),
+# so browsers keep them for a bounded time and revalidate with the ETag that
+# send_from_directory adds, getting a 304 when the file hasn't changed.
+# index.html is always revalidated so a deploy is picked up on the next page load.
+STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 3600))
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
+
+def install_sighup_handler():
+    """
+    Let a running server pick up added/removed assets on SIGHUP (POSIX only).
+    signal.signal only works on the main thread, so this is called from the
+    entry point (or gunicorn's post_worker_init hook) rather than at import.
+    """
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, refresh_static_files)
+
+# Pages that must always be revalidated, whichever route serves them
+_NO_CACHE_PAGES = frozenset({'index.html'})
+
+def _send_static(directory, filename):
+    response = send_from_directory(directory, filename)
+    # send_from_directory streams the file (direct_passthrough), which Flask-Compress
+    # skips; the assets are small, so read them into memory and let it gzip them.
+    # Partial (206) range responses are left as they are.
+    if response.status_code == 200:
+        response.direct_passthrough = False
+        response.set_data(response.get_data())
+    if filename in _NO_CACHE_PAGES:
+        response.headers['Cache-Control'] = 'no-cache, must-revalidate'
+    return response
 
 @app.route('/')
 def index():
     """Serve the primary entry point (index.html)."""
-    return send_from_directory('.', 'index.html')
+    return _send_static('.', 'index.html')
 
 @app.route('/<path:filename>')
 def serve_static(filename):
     """Serve static assets like CSS and JavaScript files from the root directory."""
-    # SECURITY FIX #3: Validate path before serving
-    if not is_safe_path('.', filename, ALLOWED_EXTENSIONS):
+    # SECURITY FIX #3: Only serve files from the pre-vetted whitelist
+    if filename not in _STATIC_FILES:
         return jsonify({'error': 'File not found'}), 404
     
     try:
-        return send_from_directory('.', filename)
+        return _send_static('.', filename)
     except:
         return jsonify({'error': 'File not found'}), 404
 
 @app.route('/js/<path:filename>')
 def serve_js(filename):
     """Serve modular JavaScript files from the 'js' subdirectory."""
-    # SECURITY FIX #3: Validate path before serving
-    if not is_safe_path('js', filename, ALLOWED_EXTENSIONS):
+    # SECURITY FIX #3: Only serve files from the pre-vetted whitelist
+    if filename not in _JS_FILES:
         return jsonify({'error': 'File not found'}), 404
     
     try:
-        return send_from_directory('js', filename)
+        return _send_static('js', filename)
     except:
         return jsonify({'error': 'File not found'}), 404
 
@@ -420,15 +760,20 @@ def add_security_headers(response):
     return response
 
 if __name__ == '__main__':
+    install_sighup_handler()
+
     # SECURITY FIX #8: Use environment variable for debug mode
     debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     
-    # Initialize the Flask development server
     port = int(os.environ.get('PORT', 5000))
-    print(f"Starting server on http://localhost:{port}...")
+    logger.info("Starting server on http://localhost:%s...", port)
     
     # WARNING: Never use debug=True in production!
     if debug_mode:
-        print("WARNING: Running in DEBUG mode. This should NEVER be used in production!")
-    
-    app.run(debug=debug_mode, port=port, host='127.0.0.1')
+        logger.warning("Running in DEBUG mode. This should NEVER be used in production!")
+        # The Flask development server provides the reloader and debugger
+        app.run(debug=True, port=port, host='127.0.0.1')
+    else:
+        # gevent serves many concurrent requests while each waits on Companies House
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(('127.0.0.1', port), app).serve_forever()
@@ -0,0 +1,116 @@
+"""
+Tests for the Companies House proxy's response cache.
+Upstream calls are mocked — no API key or network access needed.
+
+Run with:  pytest tests/test_server.py -v
+"""
+import sys
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+
+# Make sure the companies-house-search directory is on the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+
+# ── Fixtures ────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def srv(monkeypatch):
+    import server
+    monkeypatch.setattr(server, 'COMPANIES_HOUSE_API_KEY', 'test-key')
+    monkeypatch.setattr(server, '_CACHE', server._MemoryCache(100))
+    return server
+
+
+def _upstream(cache_control):
+    response = MagicMock()
+    response.status_code = 200
+    response.content = b'{"company_number": "12345678"}'
+    response.headers = {'Content-Type': 'application/json', 'Cache-Control': cache_control}
+    return response
+
+
+# ── Cache-Control on proxy responses ─────────────────────────────────────────
+
+def test_hit_keeps_upstream_short_max_age(srv):
+    client = srv.app.test_client()
+    with patch.object(srv._SESSION, 'get', return_value=_upstream('max-age=10')) as upstream:
+        miss = client.get('/api/company/12345678')
+        hit = client.get('/api/company/12345678')
+
+    assert upstream.call_count == 1
+    assert miss.headers['X-Cache'] == 'MISS'
+    assert miss.headers['Cache-Control'] == 'public, max-age=10'
+    assert hit.headers['X-Cache'] == 'HIT'
+    # Never longer than what the proxy itself still holds the entry for
+    assert 0 < int(hit.headers['Cache-Control'].split('max-age=')[1]) <= 10
+
+
+def test_hit_counts_down_remaining_ttl(srv):
+    srv._CACHE.set('k', b'{}', 200, 60)
+    with patch.object(srv.time, 'monotonic', return_value=srv.time.monotonic() + 45):
+        body, status, remaining = srv._CACHE.get('k')
+    assert (body, status) == (b'{}', 200)
+    assert remaining <= 15
+
+
+def test_redis_cache_returns_remaining_ttl(srv):
+    fakeredis = pytest.importorskip('fakeredis')
+    cache = srv._RedisCache.__new__(srv._RedisCache)
+    cache._redis = fakeredis.FakeRedis()
+    cache._errors = Exception
+    cache.set('k', b'{}', 200, 10)
+
+    body, status, remaining = cache.get('k')
+    assert (body, status) == (b'{}', 200)
+    assert 0 < remaining <= 10
+    assert cache.get_many(['k', 'missing'])[1] is None
+
+
+# ── Static files ─────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize('path', ['/', '/index.html'])
+def test_index_html_always_revalidated(srv, path):
+    r = srv.app.test_client().get(path)
+    assert r.status_code == 200
+    assert r.headers['Cache-Control'] == 'no-cache, must-revalidate'
+
+
+def test_static_asset_cached(srv):
+    r = srv.app.test_client().get('/styles.css')
+    assert r.headers['Cache-Control'] == f'public, max-age={srv.STATIC_MAX_AGE}'
+
+
+@pytest.mark.parametrize('path', ['/', '/styles.css', '/js/app.js'])
+def test_static_files_gzipped(srv, path):
+    r = srv.app.test_client().get(path, headers={'Accept-Encoding': 'gzip'})
+    assert r.status_code == 200
+    assert r.headers['Content-Encoding'] == 'gzip'
+
+
+def test_static_file_revalidates_with_etag(srv):
+    client = srv.app.test_client()
+    for encoding in ('identity', 'gzip'):
+        etag = client.get('/styles.css', headers={'Accept-Encoding': encoding}).headers['ETag']
+        r = client.get('/styles.css', headers={'Accept-Encoding': encoding, 'If-None-Match': etag})
+        assert r.status_code == 304
+
+
+# ── Cache warm-up ────────────────────────────────────────────────────────────
+
+def test_warm_up_refreshes_entries_about_to_expire(srv, monkeypatch):
+    monkeypatch.setattr(srv, 'CACHE_WARM_QUERIES', ('tesco', 'sainsbury'))
+    monkeypatch.setattr(srv, 'CACHE_WARM_INTERVAL', 30)
+    _, _, _, default_items, _ = srv._PROXY_RESOURCES['search/companies']
+    keys = [srv._cache_key('/search/companies', {'q': q, **srv._paging({}, default_items)})
+            for q in srv.CACHE_WARM_QUERIES]
+    srv._CACHE.set(keys[0], b'{}', 200, 10)    # expires before the next run
+    srv._CACHE.set(keys[1], b'{}', 200, 3600)  # still fresh
+
+    with patch.object(srv._SESSION, 'get', return_value=_upstream('max-age=60')) as upstream:
+        srv.warm_search_cache()
+
+    assert upstream.call_count == 1
+    assert upstream.call_args.kwargs['params']['q'] == 'tesco'
+    assert srv._CACHE.get(keys[0])[2] > 30
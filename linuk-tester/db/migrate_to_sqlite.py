@@ -1,6 +1,6 @@
 import json
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Text
+from sqlalchemy import create_engine, event, Column, Integer, String, JSON
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 Base = declarative_base()
@@ -10,7 +10,7 @@ class Question(Base):
     id = Column(Integer, primary_key=True)
     topic = Column(String, nullable=False)
     question = Column(String, nullable=False)
-    options = Column(Text, nullable=False) # Store options as JSON string
+    options = Column(JSON, nullable=False) # Stored as JSON text, same as server.py reads it
     correct_answer = Column(String, nullable=False)
     explanation = Column(String, nullable=True)
 
@@ -22,13 +22,28 @@ def main():
         print(f"Error: Could not find {json_path}")
         return
 
-    # Delete existing DB if it exists
+    # Delete existing DB if it exists, along with any WAL/shared-memory files the
+    # server left next to it: a stale -wal would be replayed into the new database
     if os.path.exists(db_path):
         print(f"Removing old database {db_path}...")
-        os.remove(db_path)
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
 
     print(f"Creating SQLite database at {db_path}...")
-    engine = create_engine(f'sqlite:///{db_path}')
+    engine = create_engine(f'sqlite:///{db_path}', connect_args={'check_same_thread': False})
+
+    # One-shot build of a throwaway file: trade durability for speed
+    # (the database is simply recreated if the migration is interrupted).
+    # synchronous is per connection, so it is never left OFF for the server,
+    # which sets its own pragmas; this is only safe because the file is rebuilt from JSON.
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=OFF')
+        cursor.close()
+
     Base.metadata.create_all(engine)
     
     Session = sessionmaker(bind=engine)
@@ -39,18 +54,23 @@ def main():
         data = json.load(f)
 
     print(f"Migrating {len(data)} questions to SQLite...")
-    for item in data:
-        question = Question(
-            id=item['id'],
-            topic=item['topic'],
-            question=item['question'],
-            options=json.dumps(item['options']),
-            correct_answer=item['correctAnswer'],
-            explanation=item.get('explanation', '')
-        )
-        session.add(question)
-    
+    # Bulk insert: one executemany instead of per-object unit-of-work bookkeeping
+    rows = [
+        {
+            'id': item['id'],
+            'topic': item['topic'],
+            'question': item['question'],
+            'options': item['options'],
+            'correct_answer': item['correctAnswer'],
+            'explanation': item.get('explanation', '')
+        }
+        for item in data
+    ]
+    session.bulk_insert_mappings(Question, rows)
     session.commit()
+    session.close()
+    # Closing the last connection checkpoints the WAL back into questions.db
+    engine.dispose()
     print("Migration completed successfully!")
 
 if __name__ == '__main__':
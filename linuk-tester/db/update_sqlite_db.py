@@ -1,6 +1,6 @@
 import json
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Text
+from sqlalchemy import create_engine, select, Column, Integer, String, JSON
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 Base = declarative_base()
@@ -10,7 +10,7 @@ class Question(Base):
     id = Column(Integer, primary_key=True)
     topic = Column(String, nullable=False)
     question = Column(String, nullable=False)
-    options = Column(Text, nullable=False) # Store options as JSON string
+    options = Column(JSON, nullable=False) # Stored as JSON text, same as server.py reads it
     correct_answer = Column(String, nullable=False)
     explanation = Column(String, nullable=True)
 
@@ -36,27 +36,34 @@ def main():
     with open(json_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    # Get existing IDs from database
-    existing_ids = {q.id for q in session.query(Question.id).all()}
-    print(f"Found {len(existing_ids)} existing questions in SQLite.")
+    # Look up only the IDs present in the JSON (via the primary key index), so memory
+    # stays proportional to the input rather than to the whole table.
+    # Batched to stay under SQLite's bound-parameter limit.
+    incoming_ids = [item['id'] for item in data]
+    existing_ids = set()
+    for i in range(0, len(incoming_ids), 500):
+        batch = incoming_ids[i:i + 500]
+        existing_ids.update(session.scalars(select(Question.id).where(Question.id.in_(batch))))
+    print(f"Found {len(existing_ids)} of these questions already in SQLite.")
 
-    new_count = 0
-    for item in data:
-        if item['id'] not in existing_ids:
-            question = Question(
-                id=item['id'],
-                topic=item['topic'],
-                question=item['question'],
-                options=json.dumps(item['options']),
-                correct_answer=item['correctAnswer'],
-                explanation=item.get('explanation', '')
-            )
-            session.add(question)
-            new_count += 1
-    
-    if new_count > 0:
+    rows = [
+        {
+            'id': item['id'],
+            'topic': item['topic'],
+            'question': item['question'],
+            'options': item['options'],
+            'correct_answer': item['correctAnswer'],
+            'explanation': item.get('explanation', '')
+        }
+        for item in data
+        if item['id'] not in existing_ids
+    ]
+
+    if rows:
+        # Bulk insert: one executemany instead of per-object unit-of-work bookkeeping
+        session.bulk_insert_mappings(Question, rows)
         session.commit()
-        print(f"Successfully added {new_count} new questions to SQLite!")
+        print(f"Successfully added {len(rows)} new questions to SQLite!")
     else:
         print("No new questions to add.")
 
@@ -1,11 +1,13 @@
 import os
 import sys
 import json
-import time
+import asyncio
+import itertools
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from google import genai
 from google.genai import types
-import pypdf
+import pymupdf
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -22,69 +24,232 @@ load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
 QUESTIONS_PER_BATCH = 20
 TOTAL_TARGET_NEW_QUESTIONS = 100
+# Characters of source text per Gemini request (keeps each prompt focused and under limits)
+CHUNK_SIZE = 20000
+# Gemini requests in flight at once, and the minimum gap between request starts
+# (the old serial loop slept 3 seconds between calls to stay under the rate limit)
+MAX_CONCURRENT_REQUESTS = 5
+REQUEST_INTERVAL = 3
 
 # =====================================================================
 
+def _page_text(page, page_number, pdf_path):
+    """Returns the text of one page, or "" (after logging) if that page can't be parsed."""
+    try:
+        return page.get_text("text")
+    except Exception as e:
+        # One malformed page shouldn't lose the rest of the document
+        print(f"Skipping page {page_number} of {pdf_path}: {e}")
+        return ""
+
 def extract_text_from_pdf(pdf_path):
     """Extracts all text from the given PDF file."""
     print(f"Extracting text from {pdf_path}...")
-    text_content = ""
     try:
-        with open(pdf_path, "rb") as f:
-            reader = pypdf.PdfReader(f)
-            for page in reader.pages:
-                text_content += page.extract_text() + "\n"
+        with pymupdf.open(pdf_path) as doc:
+            # Collect page texts and join once; += on a str is quadratic
+            parts = []
+            for page_number, page in enumerate(doc, start=1):
+                parts.append(_page_text(page, page_number, pdf_path))
+                parts.append("\n")
+        text_content = "".join(parts)
         print(f"Successfully extracted {len(text_content)} characters of text.")
         return text_content
     except Exception as e:
         print(f"Error reading PDF: {e}")
         return ""
 
-def generate_questions_batch(client, text_chunk, start_id, batch_size=20):
-    """Uses Gemini to generate a batch of questions based on a text chunk."""
-    prompt = f"""
-    You are an expert at creating 'Life in the UK' test questions.
+def iter_text_chunks(pdf_path, chunk_size=CHUNK_SIZE):
+    """
+    Yields the PDF text in chunk_size pieces as pages are extracted, so only
+    about one chunk is held in memory and the first request can go out before
+    the rest of the document has been parsed. The chunks are identical to
+    slicing the output of extract_text_from_pdf.
+    """
+    print(f"Extracting text from {pdf_path}...")
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            buffer = []
+            size = 0
+            for page_number, page in enumerate(doc, start=1):
+                text = _page_text(page, page_number, pdf_path) + "\n"
+                buffer.append(text)
+                size += len(text)
+                if size >= chunk_size:
+                    merged = "".join(buffer)
+                    for i in range(0, len(merged) - chunk_size + 1, chunk_size):
+                        yield merged[i:i + chunk_size]
+                    tail = merged[len(merged) - len(merged) % chunk_size:]
+                    buffer = [tail]
+                    size = len(tail)
+            if size:
+                yield "".join(buffer)
+    except Exception as e:
+        print(f"Error reading PDF: {e}")
+
+def extract_many(pdf_paths):
+    """
+    Extracts the text of several PDFs in parallel worker processes (parsing is
+    CPU-bound and holds the GIL). Returns the texts in the order of pdf_paths.
+    """
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return list(executor.map(extract_text_from_pdf, pdf_paths, chunksize=4))
+
+def collect_pdf_paths(paths):
+    """Expands any directories in paths into the PDF files they contain (sorted by name)."""
+    pdf_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdf_paths.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(".pdf")
+            ))
+        else:
+            pdf_paths.append(path)
+    return pdf_paths
+
+# The fixed rubric goes in the system instruction so every request starts with the
+# same prefix, which Gemini 2.5 models cache implicitly (cached input tokens are
+# billed at a discount). It is too short for an explicit CachedContent.
+SYSTEM_INSTRUCTION = """
+You are an expert at creating 'Life in the UK' test questions.
+
+The questions should be formatted as a JSON array of objects.
+Each object must have the following keys strictly:
+- "id": an integer
+- "topic": a string representing the topic (e.g., "Values and Principles", "What is the UK?", "History", "Modern Society", "Government & Law")
+- "question": the question string
+- "options": an array of exactly 4 string options
+- "correctAnswer": the correct option string (must match exactly one of the options)
+- "explanation": a brief string explaining why the answer is correct
+
+Return ONLY valid JSON. Output must start with [ and end with ]. Do not include Markdown blocks like ```json.
+"""
+
+GENERATION_CONFIG = types.GenerateContentConfig(
+    system_instruction=SYSTEM_INSTRUCTION,
+    response_mime_type="application/json",
+)
+
+def _build_prompt(text_chunk, start_id, batch_size):
+    return f"""
     Based on the following excerpt from the official study materials, generate exactly {batch_size} unique, accurate multiple-choice questions.
-    
-    The questions should be formatted as a JSON array of objects.
-    Each object must have the following keys strictly:
-    - "id": an integer starting from {start_id}
-    - "topic": a string representing the topic (e.g., "Values and Principles", "What is the UK?", "History", "Modern Society", "Government & Law")
-    - "question": the question string
-    - "options": an array of exactly 4 string options
-    - "correctAnswer": the correct option string (must match exactly one of the options)
-    - "explanation": a brief string explaining why the answer is correct
+    Number the "id" keys consecutively starting from {start_id}.
     
     Source Material Excerpt:
     {text_chunk}
-    
-    Return ONLY valid JSON. Output must start with [ and end with ]. Do not include Markdown blocks like ```json.
     """
-    
+
+def _parse_questions(response):
+    # Clean up potential markdown formatting
+    res_text = response.text.strip()
+    if res_text.startswith("```json"):
+        res_text = res_text[7:]
+    if res_text.endswith("```"):
+        res_text = res_text[:-3]
+    return json.loads(res_text.strip())
+
+def generate_questions_batch(client, text_chunk, start_id, batch_size=20):
+    """Uses Gemini to generate a batch of questions based on a text chunk."""
     print(f"Requesting {batch_size} questions from Gemini API...")
     try:
         response = client.models.generate_content(
             model='gemini-2.5-flash',
-            contents=prompt,
+            contents=_build_prompt(text_chunk, start_id, batch_size),
+            config=GENERATION_CONFIG,
         )
-        
-        # Clean up potential markdown formatting
-        res_text = response.text.strip()
-        if res_text.startswith("```json"):
-            res_text = res_text[7:]
-        if res_text.endswith("```"):
-            res_text = res_text[:-3]
-            
-        questions = json.loads(res_text.strip())
-        return questions
+        return _parse_questions(response)
     except Exception as e:
         print(f"Error generating questions: {e}")
         return []
 
+async def generate_questions_batch_async(client, text_chunk, start_id, batch_size=20):
+    """Async version of generate_questions_batch, using the client's aio interface."""
+    print(f"Requesting {batch_size} questions from Gemini API...")
+    try:
+        response = await client.aio.models.generate_content(
+            model='gemini-2.5-flash',
+            contents=_build_prompt(text_chunk, start_id, batch_size),
+            config=GENERATION_CONFIG,
+        )
+        return _parse_questions(response)
+    except Exception as e:
+        print(f"Error generating questions: {e}")
+        return []
+
+async def generate_questions_concurrently(client, jobs):
+    """
+    Runs generate_questions_batch_async for each (text_chunk, start_id, batch_size)
+    job concurrently, at most MAX_CONCURRENT_REQUESTS at a time and with request
+    starts spaced REQUEST_INTERVAL seconds apart. Returns the batches in job order.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def run(index, job):
+        # Stagger the start times so the request rate matches the old serial loop
+        await asyncio.sleep(max(0.0, start + index * REQUEST_INTERVAL - loop.time()))
+        async with semaphore:
+            return await generate_questions_batch_async(client, *job)
+
+    return await asyncio.gather(*(run(i, job) for i, job in enumerate(jobs)))
+
+async def generate_until(client, chunks, all_questions, target_count, current_id, progress):
+    """
+    Requests batches until all_questions reaches target_count or chunks run out.
+    Each wave submits every batch still needed at once (the semaphore in
+    generate_questions_concurrently bounds them); failed batches are refilled by
+    the next wave. New questions are appended to all_questions and to progress.
+    """
+    chunk = next(chunks, None)
+    while len(all_questions) < target_count and chunk is not None:
+        # Plan a wave of requests covering what is still needed
+        remaining = target_count - len(all_questions)
+        jobs = []
+        while remaining > 0 and chunk is not None:
+            batch_size = min(QUESTIONS_PER_BATCH, remaining)
+            jobs.append((chunk, current_id + len(jobs) * QUESTIONS_PER_BATCH, batch_size))
+            remaining -= batch_size
+            chunk = next(chunks, None)
+
+        batches = await generate_questions_concurrently(client, jobs)
+
+        for batch in batches:
+            if not batch:
+                print("Failed to generate batch, skipping...")
+                continue
+            # Batches come back in any size, so renumber to keep IDs contiguous
+            for question in batch:
+                question["id"] = current_id
+                current_id += 1
+            all_questions.extend(batch)
+            # Save intermediate progress: append just this batch instead of rewriting the whole file
+            progress.write("".join(json.dumps(q, separators=(',', ':')) + "\n" for q in batch))
+            progress.flush()
+            print(f"Successfully generated {len(batch)} new questions. Total in DB so far: {len(all_questions)}")
+
+def read_progress_log(log_path):
+    """Reads questions saved to a JSONL progress log by an interrupted run."""
+    if not os.path.exists(log_path):
+        return []
+    questions = []
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                questions.append(json.loads(line))
+            except ValueError:
+                # A crash mid-write can leave the last line truncated
+                print(f"Skipping unreadable line in {log_path}")
+    return questions
+
 def main():
-    parser = argparse.ArgumentParser(description="Generate Life in the UK test questions from a PDF.")
-    parser.add_argument("--pdf", type=str, default=os.getenv("LINUK_PDF_PATH"),
-                        help="Path to the study materials PDF. Can also be set via LINUK_PDF_PATH env var.")
+    parser = argparse.ArgumentParser(description="Generate Life in the UK test questions from PDFs.")
+    parser.add_argument("--pdf", type=str, nargs="+",
+                        default=[os.getenv("LINUK_PDF_PATH")] if os.getenv("LINUK_PDF_PATH") else None,
+                        help="Study materials PDFs or directories of PDFs. Can also be set via LINUK_PDF_PATH env var.")
     parser.add_argument("--output", type=str, default=os.getenv("LINUK_OUTPUT_FILE", r"db\local_questions.json"),
                         help="Output JSON file path. Can also be set via LINUK_OUTPUT_FILE env var.")
     args = parser.parse_args()
@@ -94,8 +259,10 @@ def main():
         print("Example: python generate_questions.py --pdf \"C:/path/to/study-materials.pdf\"")
         sys.exit(1)
 
-    PDF_PATH = args.pdf
+    PDF_PATHS = collect_pdf_paths(args.pdf)
     OUTPUT_FILE = args.output
+    # New batches are appended here as they arrive and merged into OUTPUT_FILE once at the end
+    PROGRESS_FILE = OUTPUT_FILE + '.jsonl'
 
     if not API_KEY:
         print("ERROR: GEMINI_API_KEY environment variable is not set.")
@@ -107,14 +274,17 @@ def main():
     # Create db folder if it doesn't exist
     os.makedirs('db', exist_ok=True)
 
-    text_content = extract_text_from_pdf(PDF_PATH)
-    if not text_content:
+    # Split the text into chunks to feed the AI (approx 20,000 chars per chunk to avoid hitting limits and keep focus).
+    # A single PDF is streamed; several are extracted in parallel and chunked as one text.
+    if len(PDF_PATHS) == 1:
+        chunks = iter_text_chunks(PDF_PATHS[0])
+    else:
+        text_content = "".join(extract_many(PDF_PATHS))
+        chunks = (text_content[i:i + CHUNK_SIZE] for i in range(0, len(text_content), CHUNK_SIZE))
+    chunk = next(chunks, None)
+    if chunk is None:
         return
-        
-    # Split text into chunks to feed the AI (approx 20,000 chars per chunk to avoid hitting limits and keep focus)
-    chunk_size = 20000
-    chunks = [text_content[i:i+chunk_size] for i in range(0, len(text_content), chunk_size)]
-    
+
     # Load existing database to append to it
     all_questions = []
     current_id = 1000
@@ -124,41 +294,35 @@ def main():
             with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
                 all_questions = json.load(f)
             print(f"Loaded {len(all_questions)} existing questions from {OUTPUT_FILE}")
-            
-            # Find the highest existing ID to continue from there
-            if all_questions:
-                current_id = max(q.get("id", 1000) for q in all_questions) + 1
         except Exception as e:
             print(f"Error reading existing database: {e}")
+
+    # Recover batches from a previous run that stopped before writing OUTPUT_FILE
+    existing_ids = {q.get("id") for q in all_questions}
+    recovered = [q for q in read_progress_log(PROGRESS_FILE) if q.get("id") not in existing_ids]
+    if recovered:
+        all_questions.extend(recovered)
+        print(f"Recovered {len(recovered)} questions from {PROGRESS_FILE}")
+    if all_questions:
+        current_id = max(q.get("id", 1000) for q in all_questions) + 1
             
     initial_count = len(all_questions)
     target_total_count = initial_count + TOTAL_TARGET_NEW_QUESTIONS
     
     print(f"Starting generation of {TOTAL_TARGET_NEW_QUESTIONS} new questions...")
     
-    chunk_idx = 0
-    while len(all_questions) < target_total_count and chunk_idx < len(chunks):
-        # Determine how many we need in this batch
-        remaining = target_total_count - len(all_questions)
-        batch_size = min(QUESTIONS_PER_BATCH, remaining)
-        
-        batch = generate_questions_batch(client, chunks[chunk_idx], current_id, batch_size)
-        
-        if batch:
-            all_questions.extend(batch)
-            current_id += len(batch)
-            print(f"Successfully generated {len(batch)} new questions. Total in DB so far: {len(all_questions)}")
-            
-            # Save intermediate progress
-            with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(all_questions, f, indent=4)
-        else:
-            print("Failed to generate batch, retrying or skipping...")
-            
-        chunk_idx += 1
-        # Sleep to avoid rate limits
-        time.sleep(3)
-        
+    with open(PROGRESS_FILE, 'w', encoding='utf-8') as progress:
+        # Carry recovered questions over so a second interruption still keeps them
+        progress.write("".join(json.dumps(q, separators=(',', ':')) + "\n" for q in recovered))
+        # One event loop for every wave: the client's async HTTP pool is bound to it
+        asyncio.run(generate_until(client, itertools.chain([chunk], chunks), all_questions,
+                                   target_total_count, current_id, progress))
+
+    # Consolidate: write the full JSON file once, then drop the progress log
+    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(all_questions, f, indent=4)
+    os.remove(PROGRESS_FILE)
+
     print(f"\nDone! Successfully generated {len(all_questions) - initial_count} new questions.")
     print(f"Total database size: {len(all_questions)} questions.")
     print(f"Data saved to {OUTPUT_FILE}")
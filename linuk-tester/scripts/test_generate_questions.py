@@ -1,28 +1,56 @@
+import asyncio
 import json
 import pytest
-from unittest.mock import patch, MagicMock
-from scripts.generate_questions import extract_text_from_pdf, generate_questions_batch
+from unittest.mock import patch, MagicMock, AsyncMock
+from scripts.generate_questions import (
+    extract_text_from_pdf, iter_text_chunks, generate_questions_batch, generate_questions_concurrently,
+    generate_until, read_progress_log, collect_pdf_paths
+)
 
-@patch('scripts.generate_questions.pypdf.PdfReader')
-def test_extract_text_from_pdf(MockPdfReader):
+@patch('scripts.generate_questions.pymupdf.open')
+def test_extract_text_from_pdf(mock_open_pdf):
     # Create mock pages
     mock_page1 = MagicMock()
-    mock_page1.extract_text.return_value = "Page 1 Content"
+    mock_page1.get_text.return_value = "Page 1 Content"
     mock_page2 = MagicMock()
-    mock_page2.extract_text.return_value = "Page 2 Content"
+    mock_page2.get_text.return_value = "Page 2 Content"
     
-    # Configure reader
-    mock_reader_instance = MagicMock()
-    mock_reader_instance.pages = [mock_page1, mock_page2]
-    MockPdfReader.return_value = mock_reader_instance
+    # Configure the document (used as a context manager and iterated for pages)
+    mock_open_pdf.return_value.__enter__.return_value = [mock_page1, mock_page2]
     
-    # Mock open to avoid actual file I/O
-    with patch('builtins.open', MagicMock()):
-        result = extract_text_from_pdf("dummy.pdf")
+    result = extract_text_from_pdf("dummy.pdf")
         
     assert "Page 1 Content" in result
     assert "Page 2 Content" in result
     assert result == "Page 1 Content\nPage 2 Content\n"
+    mock_page1.get_text.assert_called_with("text")
+
+@patch('scripts.generate_questions.pymupdf.open')
+def test_iter_text_chunks_matches_full_text(mock_open_pdf):
+    pages = []
+    for text in ["a" * 7, "b" * 3, "", "c" * 12, "d"]:
+        page = MagicMock()
+        page.get_text.return_value = text
+        pages.append(page)
+    mock_open_pdf.return_value.__enter__.return_value = pages
+
+    full_text = extract_text_from_pdf("dummy.pdf")
+    chunks = list(iter_text_chunks("dummy.pdf", chunk_size=5))
+
+    assert chunks == [full_text[i:i + 5] for i in range(0, len(full_text), 5)]
+
+@patch('scripts.generate_questions.pymupdf.open')
+def test_extract_text_skips_unreadable_page(mock_open_pdf, capsys):
+    good_page = MagicMock()
+    good_page.get_text.return_value = "Good page"
+    bad_page = MagicMock()
+    bad_page.get_text.side_effect = RuntimeError("broken content stream")
+    mock_open_pdf.return_value.__enter__.return_value = [bad_page, good_page]
+
+    result = extract_text_from_pdf("dummy.pdf")
+
+    assert result == "\nGood page\n"
+    assert "Skipping page 1 of dummy.pdf" in capsys.readouterr().out
 
 def test_extract_text_missing_file():
     # Should catch FileNotFoundError and return empty string
@@ -58,6 +86,10 @@ def test_generate_questions_batch():
     assert len(result) == 1
     assert result[0]["id"] == 1000
     assert result[0]["topic"] == "History"
+    # The fixed rubric travels as a system instruction, the excerpt as contents
+    call_kwargs = mock_client.models.generate_content.call_args.kwargs
+    assert call_kwargs["config"].response_mime_type == "application/json"
+    assert "some text" in call_kwargs["contents"]
     
 def test_generate_questions_batch_error():
     mock_client = MagicMock()
@@ -67,3 +99,63 @@ def test_generate_questions_batch_error():
     result = generate_questions_batch(mock_client, "text", 1, 1)
     # Should handle error and return empty list
     assert result == []
+
+@patch('scripts.generate_questions.REQUEST_INTERVAL', 0)
+def test_generate_questions_concurrently():
+    mock_client = MagicMock()
+
+    async def fake_generate(model, contents, config):
+        # Answer the later chunk first to check results keep job order
+        await asyncio.sleep(0.01 if "first" in contents else 0)
+        response = MagicMock()
+        response.text = json.dumps([{"id": 1, "question": contents.split("Excerpt:")[1].split()[0]}])
+        return response
+
+    mock_client.aio.models.generate_content = AsyncMock(side_effect=fake_generate)
+
+    jobs = [("first chunk", 1000, 1), ("second chunk", 1020, 1)]
+    result = asyncio.run(generate_questions_concurrently(mock_client, jobs))
+
+    assert [batch[0]["question"] for batch in result] == ["first", "second"]
+    assert mock_client.aio.models.generate_content.await_count == 2
+
+@patch('scripts.generate_questions.REQUEST_INTERVAL', 0)
+def test_generate_until_refills_failed_batches():
+    mock_client = MagicMock()
+    calls = []
+
+    async def fake_generate(model, contents, config):
+        calls.append(contents)
+        if len(calls) == 1:
+            raise Exception("API Error")
+        response = MagicMock()
+        response.text = json.dumps([{"id": 0, "question": "q"}] * 20)
+        return response
+
+    mock_client.aio.models.generate_content = AsyncMock(side_effect=fake_generate)
+    progress = MagicMock()
+    all_questions = []
+
+    chunks = iter(["chunk %d" % i for i in range(5)])
+    asyncio.run(generate_until(mock_client, chunks, all_questions, 40, 1000, progress))
+
+    # Both batches of the first wave go out together; the failed one is refilled by a second wave
+    assert len(calls) == 3
+    assert [q["id"] for q in all_questions] == list(range(1000, 1040))
+
+def test_read_progress_log_skips_truncated_line(tmp_path):
+    log_path = tmp_path / "questions.json.jsonl"
+    log_path.write_text('{"id":1000,"question":"q1"}\n\n{"id":1001,"question":"q2"}\n{"id":10', encoding="utf-8")
+
+    result = read_progress_log(str(log_path))
+
+    assert [q["id"] for q in result] == [1000, 1001]
+    assert read_progress_log(str(tmp_path / "missing.jsonl")) == []
+
+def test_collect_pdf_paths_expands_directories(tmp_path):
+    for name in ["b.pdf", "a.PDF", "notes.txt"]:
+        (tmp_path / name).write_text("x")
+
+    result = collect_pdf_paths([str(tmp_path), "single.pdf"])
+
+    assert result == [str(tmp_path / "a.PDF"), str(tmp_path / "b.pdf"), "single.pdf"]
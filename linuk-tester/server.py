@@ -1,40 +1,81 @@
 import csv
+import hashlib
 import io
-import json
 import os
+import random
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Optional
 
-from fastapi import Cookie, Depends, FastAPI, HTTPException, Request, Response
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import Cookie, Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+import orjson
 from pydantic import BaseModel
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
-from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
-                         String, Text, func, text)
-from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Index,
+                         Integer, String, Text, case, func, text)
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 
 # --- Application Configuration ---
 TEST_QUESTION_COUNT = 24
 TEST_DURATION_MINUTES = 45
 TEST_PASS_MARK = 18
 STATS_LOOKBACK_DAYS = 30
+INDEX_CACHE_SECONDS = 60  # topic counts only change when the question DB is rebuilt
+MAX_QUESTION_LIMIT = 200  # caps ?limit= so the sampled IDs stay well inside SQLite's bound-parameter limit
+RANDOM_SAMPLE_ROUNDS = 3  # min/max ID guessing rounds before falling back to the full ID list
 
 # --- Rate Limiter ---
 limiter = Limiter(key_func=get_remote_address)
 
-app = FastAPI(title="LinUK Tester Backend")
+# orjson encodes straight to bytes and is much faster than the stdlib encoder
+app = FastAPI(title="LinUK Tester Backend", default_response_class=ORJSONResponse)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # --- Database Setup ---
 DB_PATH = os.path.join(os.path.dirname(__file__), 'db', 'questions.db')
-engine = create_engine(f'sqlite:///{DB_PATH}', connect_args={"check_same_thread": False})
+engine = create_engine(
+    f'sqlite:///{DB_PATH}',
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, _record):
+    # WAL lets readers carry on while record_progress writes, and synchronous=NORMAL
+    # drops the per-commit fsync that WAL doesn't need. 64 MB page cache, 256 MB mmap.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
 Base = declarative_base()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions are synchronous, so endpoints that use them are plain `def`:
+# FastAPI runs those in its threadpool instead of blocking the event loop.
+
+
+def get_db():
+    """FastAPI dependency: one session per request, closed once the response is done."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
 
 
 # --- Models ---
@@ -53,7 +94,9 @@ class Question(Base):
             "id": self.id,
             "topic": self.topic,
             "question": self.question,
-            "options": json.loads(self.options),
+            # Stored as JSON text already, so embed it verbatim instead of parsing it;
+            # only ORJSONResponse can serialize this
+            "options": orjson.Fragment(self.options),
             "correctAnswer": self.correct_answer,
             "explanation": self.explanation
         }
@@ -81,7 +124,7 @@ class TestSession(Base):
     __tablename__ = 'test_sessions'
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     score = Column(Float, nullable=False)
     total_questions = Column(Integer, nullable=False)
 
@@ -92,9 +135,12 @@ class UserResponse(Base):
     session_id = Column(Integer, ForeignKey('test_sessions.id'), nullable=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
     question_id = Column(Integer, ForeignKey('questions.id'), nullable=True)
-    topic = Column(String, nullable=False)
+    topic = Column(String, nullable=False, index=True)
     is_correct = Column(Boolean, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+
+    # Covers the per-topic total/correct counts in the stats endpoint
+    __table_args__ = (Index('ix_resp_topic_correct', 'topic', 'is_correct'),)
 
 
 # --- Pydantic Schemas ---
@@ -117,13 +163,19 @@ class AuthPayload(BaseModel):
 
 
 # --- DB Init ---
-Base.metadata.create_all(bind=engine)
-
+# Done at startup rather than import, so importing the module (tests, tooling)
+# never opens db/questions.db or switches it to WAL mode.
 
 @app.on_event("startup")
 async def ensure_indexes():
+    Base.metadata.create_all(bind=engine)
     with engine.connect() as conn:
+        # create_all only indexes tables it creates, so add indexes to existing databases here
         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_topic ON questions (topic)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_user_responses_topic ON user_responses (topic)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_user_responses_timestamp ON user_responses (timestamp)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_resp_topic_correct ON user_responses (topic, is_correct)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_test_sessions_timestamp ON test_sessions (timestamp)"))
         # Add columns to existing tables if they don't exist (safe migrations)
         try:
             conn.execute(text("ALTER TABLE test_sessions ADD COLUMN user_id INTEGER REFERENCES users(id)"))
@@ -158,24 +210,32 @@ def _generate_token() -> str:
     return secrets.token_urlsafe(32)
 
 
-def get_current_user(session_token: Optional[str] = Cookie(None)) -> Optional[int]:
-    """Returns user_id if authenticated, else None (guest)."""
+def _lookup_user_id(db: Session, session_token: Optional[str]) -> Optional[int]:
+    """Returns the user_id for a live session token using an existing session, else None."""
     if not session_token:
         return None
-    db = SessionLocal()
-    try:
-        session = db.query(UserSession).filter(
-            UserSession.token == session_token,
-            UserSession.expires_at > datetime.utcnow()
-        ).first()
-        return session.user_id if session else None
-    finally:
-        db.close()
-
-
-def require_user(session_token: Optional[str] = Cookie(None)) -> int:
+    session = db.query(UserSession).filter(
+        UserSession.token == session_token,
+        UserSession.expires_at > datetime.utcnow()
+    ).first()
+    return session.user_id if session else None
+
+
+def get_current_user(session_token: Optional[str] = Cookie(None),
+                     authorization: Optional[str] = Header(None),
+                     db: Session = Depends(get_db)) -> Optional[int]:
+    """
+    Returns user_id if authenticated, else None (guest).
+    The token comes from the session cookie or an "Authorization: Bearer" header,
+    and is looked up on the request's own DB session.
+    """
+    if not session_token and authorization and authorization.lower().startswith("bearer "):
+        session_token = authorization[len("bearer "):].strip()
+    return _lookup_user_id(db, session_token)
+
+
+def require_user(user_id: Optional[int] = Depends(get_current_user)) -> int:
     """Like get_current_user but raises 401 if not authenticated."""
-    user_id = get_current_user(session_token)
     if user_id is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
     return user_id
@@ -189,32 +249,57 @@ app.mount("/assets", StaticFiles(directory="assets"), name="assets")
 
 # --- Page Routes ---
 
+PAGE_MAX_AGE = 300
+
+
+@lru_cache(maxsize=None)
+def _load_page(path: str):
+    """Reads a page once and returns (bytes, ETag); pages only change on deploy."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return data, f'"{hashlib.md5(data).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header (a list of tags, or *) against etag."""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def _page_response(request: Request, path: str, media_type: str, cache_control: str) -> Response:
+    data, etag = _load_page(path)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type=media_type, headers=headers)
+
+
 @app.get("/")
-async def root():
-    return FileResponse("index.html")
+async def root(request: Request):
+    return _page_response(request, "index.html", "text/html", f"public, max-age={PAGE_MAX_AGE}")
 
 @app.get("/sw.js")
-async def get_sw():
-    return FileResponse("sw.js", media_type="application/javascript")
+async def get_sw(request: Request):
+    # Always revalidate the service worker so updates are picked up promptly
+    return _page_response(request, "sw.js", "application/javascript", "no-cache")
 
 @app.get("/manifest.json")
-async def get_manifest():
-    return FileResponse("manifest.json", media_type="application/json")
+async def get_manifest(request: Request):
+    return _page_response(request, "manifest.json", "application/json", f"public, max-age={PAGE_MAX_AGE}")
 
 @app.get("/test_runner.html")
-async def get_test_runner():
-    return FileResponse("test_runner.html")
+async def get_test_runner(request: Request):
+    return _page_response(request, "test_runner.html", "text/html", f"public, max-age={PAGE_MAX_AGE}")
 
 
 # --- Auth Endpoints ---
 
 @app.post("/api/auth/register")
-async def register(payload: AuthPayload, response: Response):
+def register(payload: AuthPayload, response: Response, db: Session = Depends(get_db)):
     if len(payload.pin) < 4 or not payload.pin.isdigit():
         raise HTTPException(status_code=400, detail="PIN must be exactly 4 digits")
     if len(payload.username.strip()) < 2:
         raise HTTPException(status_code=400, detail="Username must be at least 2 characters")
-    db = SessionLocal()
     try:
         existing = db.query(User).filter(User.username == payload.username.strip()).first()
         if existing:
@@ -239,13 +324,10 @@ async def register(payload: AuthPayload, response: Response):
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
 
 
 @app.post("/api/auth/login")
-async def login(payload: AuthPayload, response: Response):
-    db = SessionLocal()
+def login(payload: AuthPayload, response: Response, db: Session = Depends(get_db)):
     try:
         user = db.query(User).filter(User.username == payload.username.strip()).first()
         if not user or _hash_pin(payload.pin, user.salt) != user.pin_hash:
@@ -265,262 +347,270 @@ async def login(payload: AuthPayload, response: Response):
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
 
 
 @app.post("/api/auth/logout")
-async def logout(response: Response, session_token: Optional[str] = Cookie(None)):
+def logout(response: Response, session_token: Optional[str] = Cookie(None),
+           db: Session = Depends(get_db)):
     if session_token:
-        db = SessionLocal()
-        try:
-            db.query(UserSession).filter(UserSession.token == session_token).delete()
-            db.commit()
-        finally:
-            db.close()
+        db.query(UserSession).filter(UserSession.token == session_token).delete()
+        db.commit()
     response.delete_cookie("session_token")
     return {"status": "logged_out"}
 
 
 @app.get("/api/auth/me")
-async def get_me(session_token: Optional[str] = Cookie(None)):
-    if not session_token:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    db = SessionLocal()
-    try:
-        session = db.query(UserSession).filter(
-            UserSession.token == session_token,
-            UserSession.expires_at > datetime.utcnow()
-        ).first()
-        if not session:
-            raise HTTPException(status_code=401, detail="Session expired or invalid")
-        user = db.query(User).filter(User.id == session.user_id).first()
-        return {"user_id": user.id, "username": user.username}
-    finally:
-        db.close()
+def get_me(user_id: int = Depends(require_user), db: Session = Depends(get_db)):
+    user = db.query(User).filter(User.id == user_id).first()
+    return {"user_id": user.id, "username": user.username}
+
+
+# --- Sampling Helpers ---
+
+def _random_question_ids(session, limit: int, topic: Optional[str] = None) -> List[int]:
+    """
+    Picks up to `limit` random question IDs in random order without ORDER BY RANDOM(),
+    which would read and sort the whole table on every request.
+    Topic samples come from the topic's IDs (read from the topic index only).
+    Whole-bank samples guess IDs between MIN(id) and MAX(id), keep the ones that
+    exist, and fall back to the full ID list if the gaps leave them short.
+    """
+    if limit <= 0:
+        return []
+    if topic is not None:
+        ids = [row[0] for row in session.query(Question.id).filter(Question.topic == topic)]
+        return random.sample(ids, min(limit, len(ids)))
+
+    low, high = session.query(func.min(Question.id), func.max(Question.id)).one()
+    if low is None:
+        return []
+    span = high - low + 1
+    picked = []
+    tried = set()
+    for _ in range(RANDOM_SAMPLE_ROUNDS):
+        need = limit - len(picked)
+        if need <= 0 or len(tried) >= span:
+            break
+        draw = min(2 * need + len(tried), span)
+        candidates = [i for i in random.sample(range(low, high + 1), draw) if i not in tried]
+        tried.update(candidates)
+        found = {row[0] for row in session.query(Question.id).filter(Question.id.in_(candidates))}
+        picked.extend([i for i in candidates if i in found][:need])
+
+    if len(picked) < limit:
+        chosen = set(picked)
+        rest = [row[0] for row in session.query(Question.id) if row[0] not in chosen]
+        picked.extend(random.sample(rest, min(limit - len(picked), len(rest))))
+    return picked
+
+
+def _questions_by_ids(session, ids: List[int]) -> List[Question]:
+    """Fetches questions by primary key, preserving the order of `ids`."""
+    if not ids:
+        return []
+    by_id = {q.id: q for q in session.query(Question).filter(Question.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id]
 
 
 # --- Quiz Endpoints ---
 
+# Serialized /api/index body and when it was built (time.monotonic())
+_index_cache = {"ts": 0.0, "data": None}
+
+
 @app.get("/api/index")
-async def get_index():
-    session = SessionLocal()
-    try:
-        topics_count = session.query(Question.topic, func.count(Question.id)).group_by(Question.topic).all()
-        topics = [{"name": t[0], "count": t[1]} for t in topics_count]
-        return {
-            "topics": topics,
-            "tests": [{"id": "dynamic"}]
-        }
-    finally:
-        session.close()
+def get_index(session: Session = Depends(get_db)):
+    if _index_cache["data"] is not None and time.monotonic() - _index_cache["ts"] < INDEX_CACHE_SECONDS:
+        return Response(content=_index_cache["data"], media_type="application/json")
+    topics_count = session.query(Question.topic, func.count(Question.id)).group_by(Question.topic).all()
+    topics = [{"name": t[0], "count": t[1]} for t in topics_count]
+    data = orjson.dumps({
+        "topics": topics,
+        "tests": [{"id": "dynamic"}]
+    })
+    _index_cache.update(ts=time.monotonic(), data=data)
+    return Response(content=data, media_type="application/json")
 
 
 @app.get("/api/topics/{topic_name}")
-async def get_topic_questions(topic_name: str, limit: int = 10, offset: int = 0):
-    session = SessionLocal()
-    try:
-        total = session.query(func.count(Question.id)).filter(Question.topic == topic_name).scalar()
-        if total == 0:
-            raise HTTPException(status_code=404, detail="Topic not found or empty")
-        if offset > 0:
-            questions = session.query(Question).filter(Question.topic == topic_name)\
-                .order_by(Question.id).offset(offset).limit(limit).all()
-        else:
-            questions = session.query(Question).filter(Question.topic == topic_name)\
-                .order_by(func.random()).limit(limit).all()
-        return {
-            "questions": [q.to_dict() for q in questions],
-            "total": total,
-            "offset": offset,
-            "limit": limit
-        }
-    finally:
-        session.close()
+def get_topic_questions(topic_name: str, limit: int = Query(10, ge=1, le=MAX_QUESTION_LIMIT),
+                        offset: int = Query(0, ge=0),
+                        session: Session = Depends(get_db)):
+    total = session.query(func.count(Question.id)).filter(Question.topic == topic_name).scalar()
+    if total == 0:
+        raise HTTPException(status_code=404, detail="Topic not found or empty")
+    if offset > 0:
+        questions = session.query(Question).filter(Question.topic == topic_name)\
+            .order_by(Question.id).offset(offset).limit(limit).all()
+    else:
+        questions = _questions_by_ids(session, _random_question_ids(session, limit, topic_name))
+    return ORJSONResponse({
+        "questions": [q.to_dict() for q in questions],
+        "total": total,
+        "offset": offset,
+        "limit": limit
+    })
 
 
 @app.get("/api/test")
 @limiter.limit("10/minute")
-async def get_test(request: Request, limit: int = TEST_QUESTION_COUNT):
-    session = SessionLocal()
-    try:
-        questions = session.query(Question).order_by(func.random()).limit(limit).all()
-        if not questions:
-            raise HTTPException(status_code=404, detail="No questions available")
-        return [q.to_dict() for q in questions]
-    finally:
-        session.close()
+def get_test(request: Request, limit: int = Query(TEST_QUESTION_COUNT, ge=1, le=MAX_QUESTION_LIMIT),
+             session: Session = Depends(get_db)):
+    questions = _questions_by_ids(session, _random_question_ids(session, limit))
+    if not questions:
+        raise HTTPException(status_code=404, detail="No questions available")
+    return ORJSONResponse([q.to_dict() for q in questions])
 
 
 # --- Progress Endpoints ---
 
 @app.post("/api/progress/record")
-async def record_progress(payload: ProgressRecordPayload,
-                           session_token: Optional[str] = Cookie(None)):
-    user_id = get_current_user(session_token)
-    session = SessionLocal()
+def record_progress(payload: ProgressRecordPayload,
+                    user_id: Optional[int] = Depends(get_current_user),
+                    session: Session = Depends(get_db)):
     try:
+        now = datetime.utcnow()
         new_session = TestSession(
             user_id=user_id,
             score=payload.score,
             total_questions=payload.total_questions,
-            timestamp=datetime.utcnow()
+            timestamp=now
         )
         session.add(new_session)
         session.flush()
 
-        for resp in payload.responses:
-            new_resp = UserResponse(
-                session_id=new_session.id,
-                user_id=user_id,
-                question_id=resp.question_id,
-                topic=resp.topic,
-                is_correct=resp.is_correct,
-                timestamp=datetime.utcnow()
-            )
-            session.add(new_resp)
+        # One executemany for all responses instead of an ORM object per row
+        rows = [
+            {
+                "session_id": new_session.id,
+                "user_id": user_id,
+                "question_id": resp.question_id,
+                "topic": resp.topic,
+                "is_correct": resp.is_correct,
+                "timestamp": now
+            }
+            for resp in payload.responses
+        ]
+        if rows:
+            session.execute(UserResponse.__table__.insert(), rows)
 
         session.commit()
         return {"status": "success", "session_id": new_session.id}
     except Exception as e:
         session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @app.get("/api/progress/stats")
-async def get_progress_stats(period: str = "30d",
-                              session_token: Optional[str] = Cookie(None)):
-    user_id = get_current_user(session_token)
-    session = SessionLocal()
-    try:
-        if period == "all":
-            date_filter = None
-        else:
-            try:
-                days = int(period.rstrip('d'))
-            except ValueError:
-                days = STATS_LOOKBACK_DAYS
-            date_filter = datetime.utcnow() - timedelta(days=days)
-
-        # Base query filters for user isolation
-        def user_filter(q, model):
-            if user_id is not None:
-                return q.filter(model.user_id == user_id)
-            return q
-
-        # 1. Activity Trend
-        activity_q = session.query(
-            func.date(UserResponse.timestamp).label("day"),
-            func.count(UserResponse.id).label("count")
-        )
-        activity_q = user_filter(activity_q, UserResponse)
-        if date_filter:
-            activity_q = activity_q.filter(UserResponse.timestamp >= date_filter)
-        activity_q = activity_q.group_by(func.date(UserResponse.timestamp))\
-            .order_by(func.date(UserResponse.timestamp))
-        activity_trend = [{"date": r.day, "count": r.count} for r in activity_q.all()]
-
-        # 2. Score Trend
-        score_q = session.query(
-            func.date(TestSession.timestamp).label("day"),
-            func.avg(TestSession.score).label("avg_score")
-        )
-        score_q = user_filter(score_q, TestSession)
-        if date_filter:
-            score_q = score_q.filter(TestSession.timestamp >= date_filter)
-        score_q = score_q.group_by(func.date(TestSession.timestamp))\
-            .order_by(func.date(TestSession.timestamp))
-        score_trend = [{"date": r.day, "avg_score": round(r.avg_score, 2)} for r in score_q.all()]
-
-        # 3. Topic Performance (always all-time)
-        totals_q = session.query(
-            UserResponse.topic,
-            func.count(UserResponse.id).label("total")
-        )
-        totals_q = user_filter(totals_q, UserResponse)
-        topic_totals = totals_q.group_by(UserResponse.topic).all()
-
-        corrects_q = session.query(
-            UserResponse.topic,
-            func.count(UserResponse.id).label("correct")
-        ).filter(UserResponse.is_correct == True)
-        corrects_q = user_filter(corrects_q, UserResponse)
-        topic_corrects = corrects_q.group_by(UserResponse.topic).all()
-
-        correct_map = {r.topic: r.correct for r in topic_corrects}
-        topic_performance = []
-        for r in topic_totals:
-            correct = correct_map.get(r.topic, 0)
-            percentage = (correct / r.total) * 100 if r.total > 0 else 0
-            topic_performance.append({
-                "topic": r.topic,
-                "percentage": round(percentage, 2),
-                "total_answered": r.total
-            })
+def get_progress_stats(period: str = "30d",
+                       user_id: Optional[int] = Depends(get_current_user),
+                       session: Session = Depends(get_db)):
+    if period == "all":
+        date_filter = None
+    else:
+        try:
+            days = int(period.rstrip('d'))
+        except ValueError:
+            days = STATS_LOOKBACK_DAYS
+        date_filter = datetime.utcnow() - timedelta(days=days)
 
-        return {
-            "activity_trend": activity_trend,
-            "score_trend": score_trend,
-            "topic_performance": topic_performance
+    # Base query filters for user isolation
+    def user_filter(q, model):
+        if user_id is not None:
+            return q.filter(model.user_id == user_id)
+        return q
+
+    # 1. Activity Trend
+    activity_q = session.query(
+        func.date(UserResponse.timestamp).label("day"),
+        func.count(UserResponse.id).label("count")
+    )
+    activity_q = user_filter(activity_q, UserResponse)
+    if date_filter:
+        activity_q = activity_q.filter(UserResponse.timestamp >= date_filter)
+    activity_q = activity_q.group_by(func.date(UserResponse.timestamp))\
+        .order_by(func.date(UserResponse.timestamp))
+    activity_trend = [{"date": r.day, "count": r.count} for r in activity_q.all()]
+
+    # 2. Score Trend
+    score_q = session.query(
+        func.date(TestSession.timestamp).label("day"),
+        func.avg(TestSession.score).label("avg_score")
+    )
+    score_q = user_filter(score_q, TestSession)
+    if date_filter:
+        score_q = score_q.filter(TestSession.timestamp >= date_filter)
+    score_q = score_q.group_by(func.date(TestSession.timestamp))\
+        .order_by(func.date(TestSession.timestamp))
+    score_trend = [{"date": r.day, "avg_score": round(r.avg_score, 2)} for r in score_q.all()]
+
+    # 3. Topic Performance (always all-time): totals and corrects in one pass
+    topic_q = session.query(
+        UserResponse.topic,
+        func.count(UserResponse.id).label("total"),
+        func.sum(case((UserResponse.is_correct == True, 1), else_=0)).label("correct")
+    )
+    topic_q = user_filter(topic_q, UserResponse)
+    topic_performance = [
+        {
+            "topic": r.topic,
+            "percentage": round((r.correct / r.total) * 100 if r.total > 0 else 0, 2),
+            "total_answered": r.total
         }
-    finally:
-        session.close()
+        for r in topic_q.group_by(UserResponse.topic).all()
+    ]
+
+    return {
+        "activity_trend": activity_trend,
+        "score_trend": score_trend,
+        "topic_performance": topic_performance
+    }
 
 
 @app.get("/api/progress/export")
-async def export_progress(session_token: Optional[str] = Cookie(None)):
-    user_id = get_current_user(session_token)
-    session = SessionLocal()
-    try:
-        q = session.query(TestSession).order_by(TestSession.timestamp)
-        if user_id is not None:
-            q = q.filter(TestSession.user_id == user_id)
-        sessions = q.all()
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["session_id", "timestamp", "score_percent", "total_questions"])
-        for s in sessions:
-            writer.writerow([s.id, s.timestamp.isoformat(), round(s.score, 2), s.total_questions])
-        output.seek(0)
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=progress_export.csv"}
-        )
-    finally:
-        session.close()
+def export_progress(user_id: Optional[int] = Depends(get_current_user),
+                    session: Session = Depends(get_db)):
+    q = session.query(TestSession).order_by(TestSession.timestamp)
+    if user_id is not None:
+        q = q.filter(TestSession.user_id == user_id)
+    sessions = q.all()
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["session_id", "timestamp", "score_percent", "total_questions"])
+    for s in sessions:
+        writer.writerow([s.id, s.timestamp.isoformat(), round(s.score, 2), s.total_questions])
+    output.seek(0)
+    return StreamingResponse(
+        iter([output.getvalue()]),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=progress_export.csv"}
+    )
 
 
 @app.get("/api/progress/questions")
-async def get_question_history(limit: int = 50, session_token: Optional[str] = Cookie(None)):
-    user_id = get_current_user(session_token)
-    session = SessionLocal()
-    try:
-        q = session.query(
-            UserResponse.question_id,
-            Question.question,
-            func.count(UserResponse.id).label("attempts"),
-            func.sum(
-                func.cast(UserResponse.is_correct, Integer)
-            ).label("correct_count")
-        ).join(Question, Question.id == UserResponse.question_id, isouter=True)\
-         .filter(UserResponse.question_id.isnot(None))
-        if user_id is not None:
-            q = q.filter(UserResponse.user_id == user_id)
-        results = q.group_by(UserResponse.question_id)\
-            .order_by(func.count(UserResponse.id).desc())\
-            .limit(limit).all()
-        return [
-            {
-                "question_id": r.question_id,
-                "question": r.question,
-                "attempts": r.attempts,
-                "correct_count": r.correct_count or 0
-            }
-            for r in results
-        ]
-    finally:
-        session.close()
+def get_question_history(limit: int = Query(50, ge=1, le=MAX_QUESTION_LIMIT), user_id: Optional[int] = Depends(get_current_user),
+                         session: Session = Depends(get_db)):
+    q = session.query(
+        UserResponse.question_id,
+        Question.question,
+        func.count(UserResponse.id).label("attempts"),
+        func.sum(
+            func.cast(UserResponse.is_correct, Integer)
+        ).label("correct_count")
+    ).join(Question, Question.id == UserResponse.question_id, isouter=True)\
+     .filter(UserResponse.question_id.isnot(None))
+    if user_id is not None:
+        q = q.filter(UserResponse.user_id == user_id)
+    results = q.group_by(UserResponse.question_id)\
+        .order_by(func.count(UserResponse.id).desc())\
+        .limit(limit).all()
+    return [
+        {
+            "question_id": r.question_id,
+            "question": r.question,
+            "attempts": r.attempts,
+            "correct_count": r.correct_count or 0
+        }
+        for r in results
+    ]
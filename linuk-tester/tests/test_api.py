@@ -63,6 +63,39 @@ def client():
         yield c
 
 
+# ── Page routes ──────────────────────────────────────────────────────────────
+
+def test_index_page_has_etag(client):
+    r = client.get("/")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/html")
+    assert r.headers["etag"]
+
+
+def test_index_page_not_modified(client):
+    etag = client.get("/").headers["etag"]
+    r = client.get("/", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+
+def test_index_page_etag_in_list(client):
+    etag = client.get("/").headers["etag"]
+    r = client.get("/", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert r.status_code == 304
+
+
+def test_index_page_etag_substring_is_not_a_match(client):
+    etag = client.get("/").headers["etag"]
+    r = client.get("/", headers={"If-None-Match": f'"{etag}-gzip"'})
+    assert r.status_code == 200
+
+
+def test_index_page_etag_wildcard(client):
+    r = client.get("/", headers={"If-None-Match": "*"})
+    assert r.status_code == 304
+
+
 # ── /api/index ───────────────────────────────────────────────────────────────
 
 def test_get_index_returns_200(client):
@@ -126,6 +159,24 @@ def test_get_topic_limit_respected(client):
     assert len(r.json()["questions"]) == 1
 
 
+def test_get_topic_random_sample_stays_in_topic(client):
+    r = client.get("/api/topics/History?limit=10")
+    questions = r.json()["questions"]
+    assert len(questions) == 1
+    assert questions[0]["topic"] == "History"
+
+
+def test_get_topic_limit_out_of_range(client):
+    for limit in (0, -5, 10_000):
+        r = client.get(f"/api/topics/History?limit={limit}")
+        assert r.status_code == 422
+
+
+def test_get_question_history_limit_out_of_range(client):
+    r = client.get("/api/progress/questions?limit=100000")
+    assert r.status_code == 422
+
+
 def test_get_topic_pagination_offset(client):
     r = client.get("/api/topics/History?offset=0&limit=10")
     assert r.status_code == 200
@@ -146,6 +197,13 @@ def test_get_test_respects_limit(client):
     assert len(r.json()) == 1
 
 
+def test_get_test_returns_distinct_questions(client):
+    r = client.get("/api/test")
+    ids = [q["id"] for q in r.json()]
+    assert len(ids) == 2
+    assert len(set(ids)) == 2
+
+
 def test_get_test_question_fields(client):
     r = client.get("/api/test?limit=1")
     q = r.json()[0]
@@ -236,6 +294,15 @@ def test_get_stats_topic_performance_has_fields(client):
         assert "total_answered" in perf[0]
 
 
+def test_get_stats_topic_performance_percentages(client):
+    client.post("/api/progress/record", json=VALID_PAYLOAD)
+    r = client.get("/api/progress/stats?period=all")
+    perf = {p["topic"]: p for p in r.json()["topic_performance"]}
+    assert perf["History"]["percentage"] == 100.0
+    assert perf["Government"]["percentage"] == 0.0
+    assert perf["History"]["total_answered"] == perf["Government"]["total_answered"]
+
+
 # ── /api/progress/export ─────────────────────────────────────────────────────
 
 def test_export_csv_returns_200(client):
@@ -308,3 +375,27 @@ def test_auth_logout(client):
     r = client.post("/api/auth/logout")
     assert r.status_code == 200
     assert r.json()["status"] == "logged_out"
+
+
+def test_auth_me_with_cookie(client):
+    client.post("/api/auth/register", json={"username": "testuser_me", "pin": "2468"})
+    r = client.get("/api/auth/me")
+    assert r.status_code == 200
+    assert r.json()["username"] == "testuser_me"
+    client.cookies.clear()
+
+
+def test_auth_me_with_bearer_token(client):
+    client.post("/api/auth/register", json={"username": "testuser_bearer", "pin": "1357"})
+    token = client.cookies.get("session_token")
+    client.cookies.clear()
+    r = client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200
+    assert r.json()["username"] == "testuser_bearer"
+
+
+def test_auth_me_invalid_cookie(client):
+    client.cookies.set("session_token", "not-a-real-token")
+    r = client.get("/api/auth/me")
+    assert r.status_code == 401
+    client.cookies.clear()
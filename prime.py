@@ -1,23 +1,146 @@
+import math
+import random
+import sys
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Largest sieve first_primes will allocate (one byte per number, so ~200 MB).
+# Beyond it, candidates are tested in chunks with the JIT-compiled predicate.
+SIEVE_MAX_BOUND = 2 * 10**8
+JIT_CHUNK_SIZE = 1 << 20
+
+# Trial division is cheap below this; above it Miller-Rabin wins
+MILLER_RABIN_THRESHOLD = 10**6
+# Miller-Rabin witnesses that are exact for every n < 3.18 * 10**23 (all 64-bit integers)
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+# Smallest composite that passes every base above
+MILLER_RABIN_EXACT_LIMIT = 318665857834031151167461
+# Extra random bases from the limit up: each lets a composite through with probability <= 1/4
+MILLER_RABIN_EXTRA_ROUNDS = 40
+
+def _miller_rabin(num, bases=MILLER_RABIN_BASES):
+    d = num - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in bases:
+        x = pow(a, d, num)
+        if x == 1 or x == num - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % num
+            if x == num - 1:
+                break
+        else:
+            return False
+    return True
+
 def is_prime(num):
-    if num <= 1:
+    if num < 4:
+        return num > 1
+    if num % 2 == 0 or num % 3 == 0:
         return False
-    for i in range(2, int(num**0.5) + 1):
+    if num >= MILLER_RABIN_EXACT_LIMIT:
+        extra = tuple(random.randrange(2, num - 1) for _ in range(MILLER_RABIN_EXTRA_ROUNDS))
+        return _miller_rabin(num, MILLER_RABIN_BASES + extra)
+    if num > MILLER_RABIN_THRESHOLD:
+        return _miller_rabin(num)
+    # 6k±1 wheel: only test divisors 5, 7, 11, 13, 17, 19, ...
+    i = 5
+    step = 2
+    while i * i <= num:
         if num % i == 0:
             return False
+        i += step
+        step = 6 - step
     return True
 
-def main():
+def _is_prime_wheel(num):
+    # 6k±1 trial division on plain ints, written so numba can compile it
+    if num < 4:
+        return num > 1
+    if num % 2 == 0 or num % 3 == 0:
+        return False
+    i = 5
+    while i * i <= num:
+        if num % i == 0 or num % (i + 2) == 0:
+            return False
+        i += 6
+    return True
+
+@lru_cache(maxsize=None)
+def _jit_prime_mask():
+    """
+    Compile the chunk predicate with numba, or return None without it.
+    numba takes a noticeable fraction of a second to import, so this only
+    happens once first_primes actually needs more than the sieve can hold.
+    """
     try:
-        n = int(input("How many prime numbers do you want to print? "))
-        count = 0
+        from numba import njit, prange
+    except ImportError:
+        return None
+    is_prime_wheel = njit(cache=True)(_is_prime_wheel)
+
+    @njit(cache=True, parallel=True)
+    def prime_mask(start, stop):
+        mask = np.zeros(stop - start, dtype=np.bool_)
+        for k in prange(stop - start):
+            mask[k] = is_prime_wheel(start + k)
+        return mask
+
+    return prime_mask
+
+def _nth_prime_upper_bound(n):
+    # Rosser's bound: the nth prime is below n(ln n + ln ln n) for n >= 6
+    if n < 6:
+        return 15
+    return int(n * (math.log(n) + math.log(math.log(n)))) + 10
+
+def first_primes(n):
+    """Return the first n primes, using a NumPy sieve when NumPy is installed."""
+    if n <= 0:
+        return []
+    if np is None:
+        primes = []
         num = 2
-        while count < n:
+        while len(primes) < n:
             if is_prime(num):
-                print(num)
-                count += 1
+                primes.append(num)
             num += 1
+        return primes
+    upper = _nth_prime_upper_bound(n)
+    prime_mask = _jit_prime_mask() if upper > SIEVE_MAX_BOUND else None
+    if prime_mask is not None:
+        # Too big to sieve in one go: test fixed-size chunks of candidates in parallel
+        primes = []
+        start = 2
+        while len(primes) < n:
+            mask = prime_mask(start, start + JIT_CHUNK_SIZE)
+            primes.extend((np.flatnonzero(mask) + start).tolist())
+            start += JIT_CHUNK_SIZE
+        return primes[:n]
+    sieve = np.ones(upper + 1, dtype=bool)
+    sieve[:2] = False
+    sieve[4::2] = False
+    for i in range(3, math.isqrt(upper) + 1, 2):
+        if sieve[i]:
+            # Odd multiples only; the evens are already cleared
+            sieve[i * i::2 * i] = False
+    return np.flatnonzero(sieve)[:n].tolist()
+
+def main():
+    try:
+        n = int(input("How many prime numbers do you want to print? "))
+        primes = first_primes(n)
+        if primes:
+            sys.stdout.write("\n".join(map(str, primes)) + "\n")
     except ValueError:
         print("Please enter a valid integer.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,34 @@
+import os
+
 import yfinance as yf
 import matplotlib.pyplot as plt
 import pandas as pd
 
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# Yahoo responses are cached on disk for an hour so repeat runs skip the network
+CACHE_NAME = 'yfinance.cache'
+CACHE_EXPIRE_SECONDS = 3600
+
+def make_ticker(ticker_symbol):
+    """Create a Ticker whose requests go through the on-disk cache when requests_cache is installed."""
+    if requests_cache is not None:
+        cache_existed = os.path.exists(CACHE_NAME)
+        session = requests_cache.CachedSession(CACHE_NAME, expire_after=CACHE_EXPIRE_SECONDS)
+        try:
+            return yf.Ticker(ticker_symbol, session=session)
+        except Exception:
+            # Newer yfinance releases only accept curl_cffi sessions: close the
+            # rejected session and don't leave its freshly created cache file behind
+            db_path = getattr(session.cache, 'db_path', CACHE_NAME)
+            session.close()
+            if not cache_existed and os.path.exists(db_path):
+                os.remove(db_path)
+    return yf.Ticker(ticker_symbol)
+
 def main():
     ticker_symbol = input("Enter a stock ticker symbol: ").upper().strip()
     
@@ -10,15 +37,12 @@ def main():
         return
 
     try:
-        ticker = yf.Ticker(ticker_symbol)
-        
-        # Fetch info to check exchange
-        # Note: yfinance can be slow to fetch info, so we do this first to validate
-        info = ticker.info
+        ticker = make_ticker(ticker_symbol)
         
-        # Check if 'exchange' is present and if it relates to NASDAQ
+        # Check the exchange with fast_info, which reads a small quote endpoint
+        # instead of the full (slow) info blob
         # Common values for NASDAQ: 'NMS', 'NASDAQ', 'NGM'
-        exchange = info.get('exchange', '').upper()
+        exchange = (ticker.fast_info.get('exchange') or '').upper()
         
         if 'NASDAQ' not in exchange and 'NMS' not in exchange and 'NGM' not in exchange:
             print(f"The ticker '{ticker_symbol}' is on exchange '{exchange}', not NASDAQ.")
@@ -42,20 +66,18 @@ def main():
 
         print(f"Fetching data for {ticker_symbol} (NASDAQ) for {period_label}...")
         
-        # Fetch history
-        hist = ticker.history(period=yf_period)
+        # Fetch history: only the closing prices are plotted, so skip the
+        # dividend/split columns and keep just the Close series
+        hist = ticker.history(period=yf_period, actions=False)['Close']
         
-        if hist.empty:
+        if hist.size == 0:
             print(f"No data found for {ticker_symbol}.")
             return
             
-        # Get Company Name
-        company_name = info.get('shortName', ticker_symbol)
-
         # Plotting
         plt.figure(figsize=(10, 6))
-        plt.plot(hist.index, hist['Close'], marker='o', linestyle='-')
-        plt.title(f"{company_name} ({ticker_symbol}) - {period_label} Performance (Close Price)")
+        plt.plot(hist.index, hist.values, marker='o', linestyle='-')
+        plt.title(f"{ticker_symbol} - {period_label} Performance (Close Price)")
         plt.xlabel("Date")
         plt.ylabel("Price (USD)")
         plt.grid(True)